@@ -6,6 +6,9 @@ from .continuous_process import (
 
 from .event import (
     Event,
+)
+
+from .event_builder import (
     EventBuilder,
     ComposedEventBuilder,
     create_timing,
@@ -15,6 +18,8 @@ from .event import (
 
 from .sim import (
     Simulation,
+    pack_simulations,
+    unpack_simulations,
 )
 
 from .sim_analyzer import (
@@ -29,6 +34,14 @@ from .sim_runner import (
     SimulationRunner,
 )
 
+from .state_log import (
+    StateLog,
+)
+
+from .event_log import (
+    EventLog,
+)
+
 from .time_generator import (
     Timing,
     OneTimeTiming,
@@ -44,6 +57,7 @@ from .utils import (
     TriangularDistribution,
     DateDistribution,
     create_distribution,
+    seed_rng,
 )
 
 from .value_generator import (
@@ -0,0 +1,83 @@
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def amortize_step(balance, month, annual_rate, term_months, prev_rate, growth,
+                  out_payment, out_interest, out_principal, out_active):
+    """Makes one monthly payment on every path, updating balance and month in place.
+
+    growth[i] carries (1 + monthly rate) ** remaining months from the previous payment, with
+    prev_rate[i] the rate it was computed at (0.0 growth means none yet); both are updated
+    in place. Paths past their term or with a cleared balance pay zero and are flagged inactive.
+    """
+    for i in prange(balance.shape[0]):
+        b = balance[i]
+        if month[i] < term_months[i] and b > 0.0:
+            monthly_rate = annual_rate[i] / 12.0
+            remaining = term_months[i] - month[i]
+            if monthly_rate == 0.0:
+                c = 1.0
+                payment = b / remaining
+            else:
+                # An unchanged rate only loses one month off the exponent: divide instead of pow
+                if growth[i] > 0.0 and annual_rate[i] == prev_rate[i]:
+                    c = growth[i] / (1.0 + monthly_rate)
+                else:
+                    c = (1.0 + monthly_rate) ** remaining
+                payment = b * monthly_rate * c / (c - 1.0)
+            prev_rate[i] = annual_rate[i]
+            growth[i] = c
+            interest = b * monthly_rate
+            principal_pay = min(payment - interest, b)
+            balance[i] = b - principal_pay
+            month[i] += 1.0
+            out_payment[i] = interest + principal_pay
+            out_interest[i] = interest
+            out_principal[i] = principal_pay
+            out_active[i] = True
+        else:
+            out_payment[i] = 0.0
+            out_interest[i] = 0.0
+            out_principal[i] = 0.0
+            out_active[i] = False
+
+
+@njit(cache=True)
+def loan_step(balance, month, annual_rate, term_months, prev_rate, growth):
+    """Scalar amortize_step for a single loan.
+
+    Returns (payment, interest, principal, new_balance, growth), where growth is passed back
+    in with this call's rate as prev_rate on the next payment (0.0 for none yet).
+    """
+    monthly_rate = annual_rate / 12.0
+    remaining = term_months - month
+    if monthly_rate == 0.0:
+        c = 1.0
+        payment = balance / remaining
+    else:
+        if growth > 0.0 and annual_rate == prev_rate:
+            c = growth / (1.0 + monthly_rate)
+        else:
+            c = (1.0 + monthly_rate) ** remaining
+        payment = balance * monthly_rate * c / (c - 1.0)
+    interest = balance * monthly_rate
+    principal_pay = min(payment - interest, balance)
+    return interest + principal_pay, interest, principal_pay, balance - principal_pay, c
+
+
+@njit(cache=True)
+def npv(rate, cash_flows, years):
+    """Net present value of cash_flows[i] received years[i] after the first flow."""
+    total = 0.0
+    for i in range(cash_flows.shape[0]):
+        total += cash_flows[i] / (1.0 + rate) ** years[i]
+    return total
+
+
+@njit(cache=True)
+def npv_derivative(rate, cash_flows, years):
+    """Analytic d(npv)/d(rate), used as Newton's fprime."""
+    total = 0.0
+    for i in range(cash_flows.shape[0]):
+        total -= years[i] * cash_flows[i] / (1.0 + rate) ** (years[i] + 1.0)
+    return total
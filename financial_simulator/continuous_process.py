@@ -1,4 +1,5 @@
 import datetime as dt
+import math
 from abc import ABC, abstractmethod
 from typing import Dict
 
@@ -13,11 +14,12 @@ class AppreciationProcess(ContinuousProcess):
     def __init__(self, rate: float, var: str = 'property_value'):
         self.rate = rate
         self.var = var
+        # (1 + rate) ** (days / 365.25) == exp(days * log1p(rate) / 365.25): one exp, no pow
+        self._log1p_rate_per_day = math.log1p(rate) / 365.25
 
     def advance(self, state: Dict[str, float], delta: dt.timedelta):
-        delta_years = delta.days / 365.25
         if self.var in state:
-            state[self.var] *= (1 + self.rate) ** delta_years
+            state[self.var] *= math.exp(self._log1p_rate_per_day * delta.days)
 
 
 def create_continuous_process(d: Dict) -> ContinuousProcess:
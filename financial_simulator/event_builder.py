@@ -0,0 +1,128 @@
+from typing import Dict, Optional
+from abc import ABC, abstractmethod
+import datetime as dt
+
+from .event import Event
+from .time_generator import Timing, OneTimeTiming, IntervalTiming, RandomTiming, SeasonalTiming
+from .value_generator import ValueGenerator, FixedValue, GrowingValue, DistributionValue, RateChangeValue, VariableRateLoanValue
+from .utils import create_distribution, parse_datetime
+
+
+class EventBuilder(ABC):
+    @abstractmethod
+    def reset(self):
+        pass
+
+    @abstractmethod
+    def next_event_time(self, current: dt.datetime, sim: 'Simulation') -> Optional[dt.datetime]:
+        pass
+
+    @abstractmethod
+    def generate_event(self, time: dt.datetime, sim: 'Simulation', already_checked: bool = False) -> Optional[Event]:
+        """Fires the event due at `time`; already_checked=True skips confirming that it is due."""
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict:
+        pass
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'EventBuilder':
+        raise NotImplementedError
+
+
+class ComposedEventBuilder(EventBuilder):
+    def __init__(self, timing: Timing, value_gen: ValueGenerator, metadata: Dict = None, name: Optional[str] = None):
+        self.timing = timing
+        self.value_gen = value_gen
+        self.metadata = metadata or {}
+        self.name = name
+        self.current_next = None
+
+    def reset(self):
+        self.timing.reset()
+        self.value_gen.reset()
+        self.current_next = None
+
+    def next_event_time(self, current: dt.datetime, sim: 'Simulation') -> Optional[dt.datetime]:
+        if self.current_next is None or self.current_next < current:
+            self.current_next = self.timing.next_time(current, sim.end)
+        return self.current_next
+
+    def generate_event(self, time: dt.datetime, sim: 'Simulation', already_checked: bool = False) -> Optional[Event]:
+        if not already_checked and self.next_event_time(time, sim) != time:
+            return None
+        cash_value, extra_meta = self.value_gen.get_value(time, sim)
+        # Events without extra metadata share the builder's dict, so event metadata is read-only
+        meta = {**self.metadata, **extra_meta} if extra_meta else self.metadata
+        event = Event(time, cash_value, meta)
+        if 'update_state' in extra_meta:
+            sim.state.update(extra_meta['update_state'])
+        self.timing.advance(time)
+        self.current_next = self.timing.next_time(time, sim.end)  # Cached for the caller's next_event_time
+        return event
+
+    def to_dict(self) -> Dict:
+        return {
+            'type': 'ComposedEventBuilder',
+            'timing': self.timing.to_json_dict(),
+            'value_gen': self.value_gen.to_json_dict(),
+            'metadata': self.metadata,
+            'name': self.name
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> 'ComposedEventBuilder':
+        return create_event_builder(d)
+
+
+def create_timing(d: Dict) -> Timing:
+    typ = d['type']
+    if typ == 'OneTime':
+        time = parse_datetime(d['time'])
+        return OneTimeTiming(time)
+    elif typ == 'Interval':
+        interval = dt.timedelta(days=d['interval_days'])
+        start_time = parse_datetime(d['start_time']) if 'start_time' in d else None
+        return IntervalTiming(interval, start_time)
+    elif typ == 'Random':
+        start = parse_datetime(d['start'])
+        end = parse_datetime(d['end'])
+        n = d['n']
+        dist = d.get('distribution', 'uniform')
+        return RandomTiming(start, end, n, dist)
+    elif typ == 'Seasonal':
+        months = d['months']
+        inner = create_timing(d['inner'])
+        return SeasonalTiming(inner, months)
+    raise ValueError(f"Unknown timing type: {typ}")
+
+
+def create_value_generator(d: Dict) -> ValueGenerator:
+    typ = d['type']
+    if typ == 'Fixed':
+        return FixedValue(d['value'])
+    elif typ == 'Growing':
+        return GrowingValue(d['initial'], d['growth_rate'], d.get('interval_days'))
+    elif typ == 'Distribution':
+        dist = create_distribution(d['dist'])
+        return DistributionValue(dist)
+    elif typ == 'RateChange':
+        dist = create_distribution(d['dist'])
+        update_key = d['update_key']
+        return RateChangeValue(dist, update_key)
+    elif typ == 'VariableRateLoan':
+        return VariableRateLoanValue(d['principal'], d['initial_rate'], d['term_months'], d['rate_key'])
+    raise ValueError(f"Unknown value generator type: {typ}")
+
+
+def create_event_builder(d: Dict) -> EventBuilder:
+    timing = create_timing(d['timing'])
+    value_gen = create_value_generator(d['value_gen'])
+    if type(timing) is IntervalTiming and isinstance(value_gen, GrowingValue) and value_gen.interval_days is None:
+        # Interval occurrences are evenly spaced, so growth can count steps instead of diffing dates
+        value_gen.interval_days = timing.interval.days
+        value_gen.reset()
+    metadata = d.get('metadata', {})
+    name = d.get('name')
+    return ComposedEventBuilder(timing, value_gen, metadata, name)
\ No newline at end of file
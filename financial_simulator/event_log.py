@@ -0,0 +1,193 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+from .event import Event
+
+
+class EventLog:
+    """Columnar event storage: parallel arrays of times and values plus the metadata fields
+    the analyzer reads (type, principal, remaining_balance).
+
+    Event types are stored as uint8 codes into a per-log string table (widened to uint16
+    past 256 distinct types). Buffers grow by doubling like StateLog. Iterating or indexing
+    yields Event objects, so code written against a list of events keeps working; bulk
+    consumers read the column properties directly without touching individual events.
+    """
+    def __init__(self, capacity: int = 64):
+        self._times = np.empty(capacity, dtype='datetime64[us]')
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._type_codes = np.empty(capacity, dtype=np.uint8)
+        self._type_table: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self._principals = np.zeros(capacity, dtype=np.float64)
+        self._balances = np.full(capacity, np.nan)
+        self._metadata: List[Dict] = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Event]:
+        times = self.times.tolist()
+        values = self.values.tolist()
+        return (Event(t, v, m) for t, v, m in zip(times, values, self._metadata))
+
+    def __getitem__(self, i: int) -> Event:
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("event index out of range")
+        return Event(self._times[i].item(), float(self._values[i]), self._metadata[i])
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self.size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self.size]
+
+    @property
+    def types(self) -> np.ndarray:
+        """Type names per event as an object array, decoded from the codes."""
+        return np.array(self._type_table, dtype=object)[self.type_codes]
+
+    @property
+    def type_codes(self) -> np.ndarray:
+        return self._type_codes[:self.size]
+
+    @property
+    def type_table(self) -> List[str]:
+        return self._type_table
+
+    def type_code(self, name: str) -> int:
+        """Code for `name`, adding it to the table on first use."""
+        code = self._type_index.get(name)
+        if code is None:
+            code = self._type_index[name] = len(self._type_table)
+            self._type_table.append(name)
+            if code > np.iinfo(self._type_codes.dtype).max:
+                self._type_codes = self._type_codes.astype(np.uint16)
+        return code
+
+    @property
+    def principals(self) -> np.ndarray:
+        return self._principals[:self.size]
+
+    @property
+    def balances(self) -> np.ndarray:
+        return self._balances[:self.size]
+
+    @property
+    def metadata(self) -> List[Dict]:
+        return self._metadata
+
+    def append(self, event: Event):
+        if self.size == len(self._times):
+            self._grow()
+        i = self.size
+        md = event.metadata
+        self._times[i] = event.time
+        self._values[i] = event.value
+        if md:
+            get = md.get
+            self._type_codes[i] = self.type_code(get('type', 'other'))
+            self._principals[i] = get('principal', 0.0)
+            self._balances[i] = get('remaining_balance', np.nan)
+        else:
+            self._type_codes[i] = self.type_code('other')
+            self._principals[i] = 0.0
+            self._balances[i] = np.nan
+        self._metadata.append(md)
+        self.size += 1
+
+    def extend(self, events: Iterable[Event]):
+        for event in events:
+            self.append(event)
+
+    def __getstate__(self) -> Dict:
+        # Drop unused capacity so pickles only carry recorded events
+        return {'_times': self.times, '_values': self.values, '_type_codes': self.type_codes,
+                '_type_table': self._type_table, '_principals': self.principals, '_balances': self.balances,
+                '_metadata': self._metadata, 'size': self.size}
+
+    def __setstate__(self, state: Dict):
+        types = state.pop('_types', None)
+        self.__dict__.update(state)
+        if types is not None:
+            self._encode_types(types[:self.size])  # Pickles from before type codes held the names
+        else:
+            self._type_index = {name: code for code, name in enumerate(self._type_table)}
+
+    def _encode_types(self, types: Iterable[str]):
+        """Replaces the type column and table with the codes of `types`, one name per event."""
+        types = list(types)
+        self._type_table = []
+        self._type_index = {}
+        self._type_codes = np.empty(len(types), dtype=np.uint8)
+        for i, name in enumerate(types):
+            self._type_codes[i] = self.type_code(name)
+
+    def _grow(self):
+        capacity = max(2 * len(self._times), 1)
+        for name, fill in (('_times', None), ('_values', None), ('_type_codes', None),
+                           ('_principals', 0.0), ('_balances', np.nan)):
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype) if fill is None else np.full(capacity, fill)
+            grown[:self.size] = old[:self.size]
+            setattr(self, name, grown)
+
+    @classmethod
+    def from_columns(cls, times: np.ndarray, values: np.ndarray, metadata: List[Dict],
+                     types: Optional[np.ndarray] = None, principals: Optional[np.ndarray] = None,
+                     balances: Optional[np.ndarray] = None, type_table: Optional[List[str]] = None) -> 'EventLog':
+        """Builds a log from whole columns; metadata-derived columns are filled in one pass
+        unless types, principals and balances are all given.
+
+        `types` holds type names, or codes into `type_table` when that is given.
+        """
+        log = cls(0)
+        n = len(metadata)
+        log._times = np.asarray(times, dtype='datetime64[us]')
+        log._values = np.asarray(values, dtype=np.float64)
+        log._metadata = list(metadata)
+        if types is not None and principals is not None and balances is not None:
+            if type_table is not None:
+                log._type_table = list(type_table)
+                log._type_index = {name: code for code, name in enumerate(log._type_table)}
+                dtype = np.uint8 if len(log._type_table) <= 256 else np.uint16
+                log._type_codes = np.asarray(types).astype(dtype)
+            else:
+                log._encode_types(types)
+            log._principals = np.asarray(principals, dtype=np.float64)
+            log._balances = np.asarray(balances, dtype=np.float64)
+            log.size = n
+            return log
+        principals = np.zeros(n, dtype=np.float64)
+        balances = np.full(n, np.nan)
+        codes = np.empty(n, dtype=np.uint16)
+        index = log._type_index
+        # One pass with the dict's get bound once per event; empty metadata keeps the defaults
+        for i, md in enumerate(log._metadata):
+            if md:
+                get = md.get
+                name = get('type', 'other')
+                principals[i] = get('principal', 0.0)
+                balances[i] = get('remaining_balance', np.nan)
+            else:
+                name = 'other'
+            code = index.get(name)
+            codes[i] = code if code is not None else log.type_code(name)
+        log._type_codes = codes.astype(np.uint8) if len(log._type_table) <= 256 else codes
+        log._principals = principals
+        log._balances = balances
+        log.size = n
+        if types is not None:
+            log._encode_types(types)
+        return log
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> 'EventLog':
+        log = cls()
+        log.extend(events)
+        return log
@@ -1,12 +1,22 @@
 import datetime as dt
+import heapq
 import json
 import pickle
+import struct
 from dataclasses import dataclass, field
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import numpy as np
 
 from .event import Event
+from .event_log import EventLog
 from .event_builder import EventBuilder
 from .continuous_process import ContinuousProcess
+from .state_log import StateLog
+
+# Prefix marking serialized datetime params, so other strings are never parsed as dates
+_DATETIME_TAG = '__dt__:'
+# Header of save_pickle files: buffer count, length-prefixed out-of-band buffers, then the pickle
+_PICKLE_MAGIC = b'FSPICKLE5\n'
 
 
 @dataclass
@@ -17,67 +27,89 @@ class Simulation:
     params: Dict[str, any] = field(default_factory=dict)
     event_builders: List[EventBuilder] = field(default_factory=list)
     continuous_processes: List[ContinuousProcess] = field(default_factory=list)
-    events: List[Event] = field(default_factory=list)
+    events: EventLog = field(default_factory=EventLog)
     state: Dict[str, float] = field(default_factory=dict)
-    state_history: Dict[dt.datetime, Dict[str, float]] = field(default_factory=dict)
+    state_history: StateLog = field(default_factory=StateLog)
+
+    def __post_init__(self):
+        if not isinstance(self.events, EventLog):
+            self.events = EventLog.from_events(self.events)
 
     def add_builder(self, builder: EventBuilder):
         self.event_builders.append(builder)
 
+    def add_event(self, event: Event):
+        self.events.append(event)
+
     def add_continuous(self, proc: ContinuousProcess):
         self.continuous_processes.append(proc)
 
     def run(self):
-        for b in self.event_builders:
-            b.reset()
         current = self.start
-        self.state_history[current] = self.state.copy()
-        while True:
-            next_times = [b.next_event_time(current, self) for b in self.event_builders]
-            next_times = [t for t in next_times if t is not None and t <= self.end]
-            if not next_times:
-                break
-            next_time = min(next_times)
+        self.state_history.append(current, self.state)
+        # Heap of (next time, builder index, builder); the index keeps simultaneous events in builder order
+        heap = []
+        for i, b in enumerate(self.event_builders):
+            b.reset()
+            t = b.next_event_time(current, self)
+            if t is not None and t <= self.end:
+                heapq.heappush(heap, (t, i, b))
+        while heap:
+            next_time = heap[0][0]
             delta = next_time - current
             for proc in self.continuous_processes:
                 proc.advance(self.state, delta)
             events_at_time = []
-            for b in self.event_builders:
-                if b.next_event_time(current, self) == next_time:
-                    event = b.generate_event(next_time, self)
-                    if event:
-                        events_at_time.append(event)
+            fired = []
+            while heap and heap[0][0] == next_time:
+                _, i, b = heapq.heappop(heap)
+                event = b.generate_event(next_time, self, already_checked=True)
+                if event:
+                    events_at_time.append(event)
+                fired.append((i, b))
+            for i, b in fired:
+                t = b.next_event_time(next_time, self)
+                if t is not None and t <= self.end:
+                    heapq.heappush(heap, (t, i, b))
             self.events.extend(events_at_time)
             if 'cumulative_cash' in self.state:
                 self.state['cumulative_cash'] += sum(e.value for e in events_at_time)
-            self.state_history[next_time] = self.state.copy()
+            self.state_history.append(next_time, self.state)
             current = next_time
 
+    def events_as_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns event times (datetime64[s]), values (float64) and types (object) as parallel arrays."""
+        return self.events.times.astype('datetime64[s]'), self.events.values, self.events.types
+
     def to_dict(self) -> Dict:
-        params_serialized = {k: v.isoformat() if isinstance(v, dt.datetime) else v for k, v in self.params.items()}
+        params_serialized = _params_to_json(self.params)
         return {
             'name': self.name,
             'start': self.start.isoformat(),
             'end': self.end.isoformat(),
             'params': params_serialized,
             # Serialize builders, processes if needed
-            'events': [e.to_dict() for e in self.events],
+            # Events as parallel lists; times as int64 epoch seconds like the state history
+            'event_times': self.events.times.astype('datetime64[s]').astype(np.int64).tolist(),
+            'event_values': self.events.values.tolist(),
+            'event_metadata': self.events.metadata,
             'state': self.state,
-            'state_history': {t.isoformat(): v for t, v in self.state_history.items()}
+            'state_history': self.state_history.to_dict()
         }
 
     @classmethod
     def from_dict(cls, d: Dict) -> 'Simulation':
-        params = {k: dt.datetime.fromisoformat(v) if isinstance(v, str) and '-' in v else v for k, v in d['params'].items()}
+        params = _params_from_json(d['params'])
         sim = cls(d['name'], dt.datetime.fromisoformat(d['start']), dt.datetime.fromisoformat(d['end']), params)
-        sim.events = [Event.from_dict(e) for e in d['events']]
+        times = np.asarray(d['event_times'], dtype=np.int64).astype('datetime64[s]')
+        sim.events = EventLog.from_columns(times, d['event_values'], d['event_metadata'])
         sim.state = d['state']
-        sim.state_history = {dt.datetime.fromisoformat(t): v for t, v in d['state_history'].items()}
+        sim.state_history = StateLog.from_dict(d['state_history'])
         return sim
 
     def save_json(self, filepath: str):
         with open(filepath, 'w') as f:
-            json.dump(self.to_dict(), f, indent=4)
+            json.dump(self.to_dict(), f, separators=(',', ':'))  # Compact output avoids the pretty-printer
 
     @classmethod
     def load_json(cls, filepath: str) -> 'Simulation':
@@ -86,10 +118,144 @@ class Simulation:
         return cls.from_dict(d)
 
     def save_pickle(self, filepath: str):
+        # Protocol 5 hands array data out of band, so large columns are written straight from their buffers
+        buffers = []
+        data = pickle.dumps(self, protocol=5, buffer_callback=buffers.append)
         with open(filepath, 'wb') as f:
-            pickle.dump(self, f)
+            f.write(_PICKLE_MAGIC)
+            f.write(struct.pack('<Q', len(buffers)))
+            for buf in buffers:
+                raw = buf.raw()
+                f.write(struct.pack('<Q', raw.nbytes))
+                f.write(raw)
+            f.write(data)
 
     @classmethod
     def load_pickle(cls, filepath: str) -> 'Simulation':
         with open(filepath, 'rb') as f:
-            return pickle.load(f)
\ No newline at end of file
+            if f.read(len(_PICKLE_MAGIC)) != _PICKLE_MAGIC:
+                f.seek(0)
+                return pickle.load(f)  # Plain pickle written by older versions
+            (count,) = struct.unpack('<Q', f.read(8))
+            buffers = []
+            for _ in range(count):
+                (size,) = struct.unpack('<Q', f.read(8))
+                buffers.append(bytearray(f.read(size)))
+            return pickle.loads(f.read(), buffers=buffers)
+
+
+def _params_to_json(params: Dict) -> Dict:
+    return {k: _DATETIME_TAG + v.isoformat() if isinstance(v, dt.datetime) else v for k, v in params.items()}
+
+
+def _params_from_json(params: Dict) -> Dict:
+    return {k: dt.datetime.fromisoformat(v[len(_DATETIME_TAG):]) if isinstance(v, str) and v.startswith(_DATETIME_TAG) else v
+            for k, v in params.items()}
+
+
+def _epoch_s(times: np.ndarray) -> np.ndarray:
+    return times.astype('datetime64[s]').astype(np.int64)
+
+
+def pack_simulations(sims: List[Simulation]) -> Dict[str, np.ndarray]:
+    """Packs a batch of simulations into flat columns for binary transport (e.g. np.savez).
+
+    Events and state rows of all simulations are concatenated, with `*_offsets` marking where
+    each simulation's rows start. Event types are stored as codes into a string table, and only
+    the metadata fields the analyzer reads (type, principal, remaining_balance) are kept. Every
+    column has a plain dtype, so the result loads with allow_pickle=False.
+    """
+    n = len(sims)
+    event_counts = np.fromiter((len(s.events) for s in sims), dtype=np.int64, count=n)
+    state_counts = np.fromiter((len(s.state_history) for s in sims), dtype=np.int64, count=n)
+    event_offsets = np.concatenate(([0], np.cumsum(event_counts)))
+    state_offsets = np.concatenate(([0], np.cumsum(state_counts)))
+
+    def concat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+    # Remap each log's type codes onto one shared table
+    table_index: Dict[str, int] = {}
+    code_parts = []
+    for s in sims:
+        remap = np.array([table_index.setdefault(t, len(table_index)) for t in s.events.type_table], dtype=np.int32)
+        code_parts.append(remap[s.events.type_codes] if len(remap) else np.empty(0, dtype=np.int32))
+    type_table = list(table_index)
+    type_codes = concat(code_parts, np.int32)
+
+    # State keys can differ between simulations: use the union and mark which ones each has
+    state_keys = list(dict.fromkeys(k for s in sims for k in s.state_history.keys()))
+    final_keys = list(dict.fromkeys(k for s in sims for k in s.state))
+    state_values = np.full((len(state_keys), int(state_offsets[-1])), np.nan)
+    state_present = np.zeros((n, len(state_keys)), dtype=bool)
+    final_values = np.full((n, len(final_keys)), np.nan)
+    final_present = np.zeros((n, len(final_keys)), dtype=bool)
+    for i, s in enumerate(sims):
+        lo, hi = state_offsets[i], state_offsets[i + 1]
+        for j, k in enumerate(state_keys):
+            if k in s.state_history._columns:
+                state_values[j, lo:hi] = s.state_history.column(k)
+                state_present[i, j] = True
+        for j, k in enumerate(final_keys):
+            if k in s.state:
+                final_values[i, j] = s.state[k]
+                final_present[i, j] = True
+
+    return {
+        'names': np.array([s.name for s in sims], dtype=str),
+        'starts': np.array([s.start.isoformat() for s in sims], dtype=str),
+        'ends': np.array([s.end.isoformat() for s in sims], dtype=str),
+        'params': np.array([json.dumps(_params_to_json(s.params)) for s in sims], dtype=str),
+        'event_offsets': event_offsets,
+        'event_times': concat([_epoch_s(s.events.times) for s in sims], np.int64),
+        'event_values': concat([s.events.values for s in sims], np.float64),
+        'event_type_codes': type_codes,
+        'event_type_table': np.array(type_table, dtype=str),
+        'event_principals': concat([s.events.principals for s in sims], np.float64),
+        'event_balances': concat([s.events.balances for s in sims], np.float64),
+        'state_offsets': state_offsets,
+        'state_times': concat([_epoch_s(s.state_history.times) for s in sims], np.int64),
+        'state_keys': np.array(state_keys, dtype=str),
+        'state_values': state_values,
+        'state_present': state_present,
+        'final_keys': np.array(final_keys, dtype=str),
+        'final_values': final_values,
+        'final_present': final_present,
+    }
+
+
+def unpack_simulations(arrays: Dict[str, np.ndarray]) -> List[Simulation]:
+    """Rebuilds simulations from pack_simulations columns; columns are sliced, not copied."""
+    event_offsets = arrays['event_offsets']
+    state_offsets = arrays['state_offsets']
+    event_times = arrays['event_times'].astype('datetime64[s]')
+    state_times = arrays['state_times'].astype('datetime64[s]')
+    event_values = arrays['event_values']
+    principals = arrays['event_principals']
+    balances = arrays['event_balances']
+    state_values = arrays['state_values']
+    state_present = arrays['state_present']
+    final_values = arrays['final_values']
+    final_present = arrays['final_present']
+    type_table = arrays['event_type_table'].tolist()
+    type_codes = arrays['event_type_codes']
+    # One shared metadata dict per event type; loan fields live in the principal/balance columns
+    type_metadata = [{'type': t} for t in type_table]
+    metadata = [type_metadata[c] for c in type_codes.tolist()]
+    state_keys = arrays['state_keys'].tolist()
+    final_keys = arrays['final_keys'].tolist()
+
+    sims = []
+    for i, name in enumerate(arrays['names'].tolist()):
+        sim = Simulation(name, dt.datetime.fromisoformat(str(arrays['starts'][i])),
+                         dt.datetime.fromisoformat(str(arrays['ends'][i])),
+                         _params_from_json(json.loads(str(arrays['params'][i]))))
+        lo, hi = event_offsets[i], event_offsets[i + 1]
+        sim.events = EventLog.from_columns(event_times[lo:hi], event_values[lo:hi], metadata[lo:hi],
+                                           type_codes[lo:hi], principals[lo:hi], balances[lo:hi], type_table)
+        lo, hi = state_offsets[i], state_offsets[i + 1]
+        sim.state_history = StateLog.from_columns(
+            state_times[lo:hi], {k: state_values[j, lo:hi] for j, k in enumerate(state_keys) if state_present[i, j]})
+        sim.state = {k: float(final_values[i, j]) for j, k in enumerate(final_keys) if final_present[i, j]}
+        sims.append(sim)
+    return sims
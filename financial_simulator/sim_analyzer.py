@@ -1,50 +1,104 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional
 import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
 from scipy.optimize import newton
 
 from .sim import Simulation
+from ._kernels import npv, npv_derivative
+
+
+
+def _percentile_color(fraction: float) -> Tuple[float, float, float]:
+    # Red at the 0th percentile through white at the median to blue at the 100th
+    if fraction <= 0.5:
+        val = fraction / 0.5
+        return (1, val, val)
+    val = (fraction - 0.5) / 0.5
+    return (1 - val, 1 - val, 1)
+
+
+_PCT_COLORS = tuple(_percentile_color(i / 10.0) for i in range(11))
 
 
 class SimulationAnalyzer:
     def __init__(self, sims: List[Simulation]):
         self.sims = sims
+        self._df_cache: Dict[int, Tuple[Simulation, pd.DataFrame]] = {}
+        self._selection_cache: Dict[Optional[str], Tuple] = {}
+        self._irr_cache: Dict[Tuple[int, float], Tuple[Simulation, float]] = {}
+        self._roi_cache: Dict[int, Tuple[Simulation, float]] = {}
+        self._matrix_cache: Dict[str, Tuple[pd.DatetimeIndex, np.ndarray]] = {}
+
+    def clear_cache(self):
+        """Drops memoized per-simulation results; call after mutating self.sims or a simulation."""
+        self._df_cache.clear()
+        self._selection_cache.clear()
+        self._irr_cache.clear()
+        self._roi_cache.clear()
+        self._matrix_cache.clear()
 
     def to_dataframe(self, sim: Simulation) -> pd.DataFrame:
-        # Create pivot for categorized cash flows
-        event_data = [{'time': e.time, 'value': e.value, 'type': e.metadata.get('type', 'other'),
-                       'principal_pay': e.metadata.get('principal', 0.0),
-                       'remaining_balance': e.metadata.get('remaining_balance', None)} for e in sim.events]
-        df = pd.DataFrame(event_data)
-        df['time'] = pd.to_datetime(df['time'])
-        df.set_index('time', inplace=True)
-        
-        type_sum = df.pivot_table(values='value', index='time', columns='type', aggfunc='sum', fill_value=0.0)
-        
-        result = type_sum.copy()
-        result['cash_flow'] = type_sum.sum(axis=1)
-        result['cumulative_cash'] = result['cash_flow'].cumsum()  # Renamed for clarity
+        # Memoized per simulation; the cache holds the sim itself so its id cannot be reused
+        cached = self._df_cache.get(id(sim))
+        if cached is not None and cached[0] is sim:
+            return cached[1]
+        result = self._build_dataframe(sim)
+        self._df_cache[id(sim)] = (sim, result)
+        return result
+
+    def _build_dataframe(self, sim: Simulation) -> pd.DataFrame:
+        # Event columns (struct of arrays) for categorized cash flows, read straight from the log
+        events = sim.events
+        times = events.times.astype('datetime64[ns]')
+        values = events.values
+        principals = events.principals
+        balances = events.balances
+
+        # Dense (time x type) sums accumulated in NumPy instead of pivot_table; the log's type
+        # codes are renumbered so the present types come out in name order, as factorize did
+        utimes, time_idx = np.unique(times, return_inverse=True)
+        table = np.array(events.type_table, dtype=object)
+        present = np.unique(events.type_codes)
+        ordered = present[np.argsort(table[present].astype(str), kind='stable')]
+        renumber = np.zeros(len(table), dtype=np.intp)
+        renumber[ordered] = np.arange(len(ordered))
+        type_codes = renumber[events.type_codes]
+        type_uniques = table[ordered]
+        buf = np.zeros((len(utimes), len(type_uniques)), dtype=np.float64)
+        np.add.at(buf, (time_idx, type_codes), values)
+        cash_flow = buf.sum(axis=1)
+
+        result = pd.DataFrame(buf, index=pd.DatetimeIndex(utimes, name='time'), columns=type_uniques)
+        result['cash_flow'] = cash_flow
+        result['cumulative_cash'] = np.cumsum(cash_flow)  # Renamed for clarity
         
-        # Join property value (align indices)
-        prop_df = pd.DataFrame.from_dict(sim.state_history, orient='index')['property_value']
-        prop_df.index = pd.to_datetime(prop_df.index)
-        result = result.join(prop_df, how='outer').ffill().bfill()  # Fill to cover all times
+        # Align property value by reindexing the one column instead of an outer join + full-frame fills
+        prop_series = pd.Series(sim.state_history.column('property_value'),
+                                index=pd.DatetimeIndex(sim.state_history.times.astype('datetime64[ns]')))
+        full_index = result.index.union(prop_series.index)
+        type_sums = buf
+        if len(full_index) != len(result.index):
+            # State recorded at times without events (e.g. an event-free start): cover them as the join did
+            result = result.reindex(full_index).ffill().bfill()
+            type_sums = result[type_uniques].to_numpy()
+        result['property_value'] = prop_series.reindex(result.index).ffill().bfill()
         
         # Infer loan balances (with initial principal)
         loan_types = ['heloc', 'seller_financing']
-        seen = set()
         for lt in loan_types:
-            lt_events = df[df['type'] == lt]
-            if not lt_events.empty:
-                first_idx = lt_events.index[0]
-                first_row = lt_events.iloc[0]
-                initial_principal = first_row['remaining_balance'] + first_row['principal_pay']
-                result.at[sim.start, f'{lt}_balance'] = initial_principal
-                for idx, row in lt_events.iterrows():
-                    result.at[idx, f'{lt}_balance'] = row['remaining_balance']
-                result[f'{lt}_balance'] = result[f'{lt}_balance'].ffill().bfill()  # Handle gaps
+            hit = np.flatnonzero(type_uniques == lt)
+            mask = type_codes == hit[0] if len(hit) else np.zeros(len(values), dtype=bool)
+            if mask.any():
+                lt_balances = balances[mask]
+                initial_principal = lt_balances[0] + principals[mask][0]
+                balance = pd.Series(np.concatenate(([initial_principal], lt_balances)),
+                                    index=pd.DatetimeIndex(np.concatenate(([np.datetime64(sim.start, 'ns')], times[mask]))))
+                balance = balance[~balance.index.duplicated(keep='last')]
+                result[f'{lt}_balance'] = balance.reindex(result.index).ffill().bfill()  # Handle gaps
             else:
                 result[f'{lt}_balance'] = 0.0
         
@@ -54,53 +108,129 @@ class SimulationAnalyzer:
         op_ex_types = ['lawn', 'maintenance', 'unexpected_repairs']
         capex_types = ['kitchen_renov', 'floors_renov', 'central_air_renov']
         debt_types = ['heloc', 'seller_financing']
-        result['revenue'] = result.get('rent_income', 0.0)
-        result['operating_expenses'] = result[ [t for t in op_ex_types if t in result.columns] ].sum(axis=1)
-        result['capex'] = result[ [t for t in capex_types if t in result.columns] ].sum(axis=1)
-        result['debt_service'] = result[ [t for t in debt_types if t in result.columns] ].sum(axis=1)
+        # Category totals straight from the dense (time x type) sums; absent types give an empty mask
+        result['revenue'] = type_sums[:, type_uniques == 'rent_income'].sum(axis=1)
+        result['operating_expenses'] = type_sums[:, np.isin(type_uniques, op_ex_types)].sum(axis=1)
+        result['capex'] = type_sums[:, np.isin(type_uniques, capex_types)].sum(axis=1)
+        result['debt_service'] = type_sums[:, np.isin(type_uniques, debt_types)].sum(axis=1)
+        other = type_sums[:, type_uniques == 'other'].sum(axis=1)
         result['noi'] = result['revenue'] + result['operating_expenses']  # Expenses negative
-        result['net_cash_flow'] = result['noi'] + result['debt_service'] + result['capex'] + result.get('other', 0.0)  # Approx equals cash_flow
+        result['net_cash_flow'] = result['noi'] + result['debt_service'] + result['capex'] + other  # Approx equals cash_flow
         result['net_worth'] = result['cumulative_cash'] + result['property_value'] - result['total_loans']
         result['dscr'] = -result['noi'] / -result['debt_service'] if result['debt_service'].any() < 0 else np.nan  # Debt Service Coverage Ratio (>1.2 ideal)
         
         return result
 
+    def _get_selection(self, rank_by: Optional[str] = None) -> Tuple:
+        """Returns (dfs, sorted_indices, selected_indices, min_x, max_x) for the percentile plots.
+
+        Simulations are ranked by the ending value of `rank_by`, or by ending cumulative cash
+        plus property value when None. Computed once per ranking and shared across plots.
+        """
+        cached = self._selection_cache.get(rank_by)
+        if cached is not None:
+            return cached
+        dfs = [self.to_dataframe(sim) for sim in self.sims]
+        if rank_by is None:
+            endings = np.fromiter((df['cumulative_cash'].iat[-1] + df['property_value'].iat[-1] for df in dfs),
+                                  dtype=np.float64, count=len(dfs))
+        else:
+            endings = np.fromiter((df[rank_by].iat[-1] for df in dfs), dtype=np.float64, count=len(dfs))
+        sorted_indices = np.argsort(endings)
+        positions = np.linspace(0, len(self.sims) - 1, 11, dtype=int)
+        selected_indices = sorted_indices[positions]
+        min_x = min(df.index.min() for df in dfs)
+        max_x = max(df.index.max() for df in dfs)
+        selection = (dfs, sorted_indices, selected_indices, min_x, max_x)
+        self._selection_cache[rank_by] = selection
+        return selection
+
+    def path_matrix(self, column: str) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+        """Returns (grid, matrix): `column` for every simulation sampled on a common time grid.
+
+        The grid holds each month end between the earliest and latest recorded time, plus the
+        latest time itself, so the last column is every simulation's ending value. Row i holds
+        simulation i's value as of each grid time, held flat before its first row and after its last.
+        """
+        cached = self._matrix_cache.get(column)
+        if cached is not None:
+            return cached
+        dfs = [self.to_dataframe(sim) for sim in self.sims]
+        start = min(df.index[0] for df in dfs)
+        end = max(df.index[-1] for df in dfs)
+        grid = pd.date_range(start, end, freq='ME')
+        if not len(grid) or grid[-1] != end:
+            grid = grid.append(pd.DatetimeIndex([end]))
+        grid_values = grid.to_numpy()
+        matrix = np.empty((len(dfs), len(grid)), dtype=np.float64)
+        for i, df in enumerate(dfs):
+            rows = np.searchsorted(df.index.to_numpy(), grid_values, side='right') - 1
+            matrix[i] = df[column].to_numpy()[np.maximum(rows, 0)]
+        result = (grid, matrix)
+        self._matrix_cache[column] = result
+        return result
+
+    def percentile_bands(self, column: str, percentiles=(10, 50, 90)) -> pd.DataFrame:
+        """Percentiles of `column` across simulations at each grid time, one column per percentile."""
+        grid, matrix = self.path_matrix(column)
+        bands = np.percentile(matrix, percentiles, axis=0)
+        return pd.DataFrame(bands.T, index=grid, columns=[f'p{p}' for p in percentiles])
+
     def compute_irr(self, sim: Simulation, selling_cost_rate: float = 0.06) -> float:
+        # Memoized like to_dataframe: compute_statistics and analyze_params both ask for every sim
+        key = (id(sim), selling_cost_rate)
+        cached = self._irr_cache.get(key)
+        if cached is not None and cached[0] is sim:
+            return cached[1]
+        irr = self._solve_irr(sim, selling_cost_rate)
+        self._irr_cache[key] = (sim, irr)
+        return irr
+
+    def _solve_irr(self, sim: Simulation, selling_cost_rate: float) -> float:
         df = self.to_dataframe(sim)
         # Group cash flows annually
-        df_resampled = df.resample('Y').sum()
+        df_resampled = df.resample('YE').sum()
         years = df_resampled.index.year
         cash_flows = df_resampled['net_cash_flow'].values
         # Initial is first year's (often negative)
         irr_series = list(cash_flows[:-1])  # Intermediate years
         # Terminal: last CF + net proceeds (prop - loans - selling costs)
-        terminal = cash_flows[-1] + df['property_value'][-1] * (1 - selling_cost_rate) - df['total_loans'][-1]
+        terminal = cash_flows[-1] + df['property_value'].iat[-1] * (1 - selling_cost_rate) - df['total_loans'].iat[-1]
         irr_series.append(terminal)
         # Use XIRR approximation
         dates = df_resampled.index
-        ordinal_dates = [(d - dates[0]).days / 365.0 for d in dates]
-        def npv(r):
-            return sum(cf / (1 + r)**t for cf, t in zip(irr_series, ordinal_dates))
+        ordinal_dates = np.asarray((dates - dates[0]).days, dtype=np.float64) / 365.0
+        flows = np.asarray(irr_series, dtype=np.float64)
         try:
-            return newton(npv, 0.1)
+            return newton(npv, 0.1, fprime=npv_derivative, args=(flows, ordinal_dates))
         except:
             return np.nan  # If convergence fails
 
     def compute_roi(self, sim: Simulation) -> float:
+        cached = self._roi_cache.get(id(sim))
+        if cached is not None and cached[0] is sim:
+            return cached[1]
+        roi = self._calc_roi(sim)
+        self._roi_cache[id(sim)] = (sim, roi)
+        return roi
+
+    def _calc_roi(self, sim: Simulation) -> float:
         df = self.to_dataframe(sim)
         years = (sim.end - sim.start).days / 365.25
         # Initial investment: net cash out at start (from params if available, else approx min cumulative)
         initial = sim.params.get('closing_fees', 0.0) + sim.params.get('appraisal', 0.0) * sim.params.get('down_fraction', 0.0) - sim.params.get('heloc_draw', 0.0)
         if initial == 0: initial = -df['cumulative_cash'].min()  # Fallback
-        ending_net = df['net_worth'][-1]
+        ending_net = df['net_worth'].iat[-1]
         return ((ending_net - initial) / initial / years) if initial > 0 else np.nan
 
     def compute_statistics(self) -> Dict:
-        dfs = [self.to_dataframe(s) for s in self.sims]
-        endings = {k: [df[k][-1] for df in dfs] for k in ['net_worth', 'cumulative_cash', 'property_value', 'total_loans']}
-        irrs = [self.compute_irr(s) for s in self.sims]
-        rois = [self.compute_roi(s) for s in self.sims]
-        breakevens = [ (df[df['net_worth'] > 0].index.min() - df.index.min()).days / 365.25 if any(df['net_worth'] > 0) else np.nan for df in dfs ]
+        dfs = [self.to_dataframe(s) for s in self.sims]  # Cached; built once per simulation
+        n = len(dfs)
+        endings = {k: np.fromiter((df[k].iat[-1] for df in dfs), dtype=np.float64, count=n)
+                   for k in ['net_worth', 'cumulative_cash', 'property_value', 'total_loans']}
+        irrs = np.fromiter((self.compute_irr(s) for s in self.sims), dtype=np.float64, count=n)
+        rois = np.fromiter((self.compute_roi(s) for s in self.sims), dtype=np.float64, count=n)
+        breakevens = np.fromiter((self._breakeven_years(df) for df in dfs), dtype=np.float64, count=n)
         stats = {
             'net_worth_mean': np.mean(endings['net_worth']), 'net_worth_std': np.std(endings['net_worth']),
             'net_worth_var_5pct': np.percentile(endings['net_worth'], 5),  # Value at Risk proxy (worst 5%)
@@ -109,141 +239,58 @@ class SimulationAnalyzer:
             'irr_mean': np.nanmean(irrs), 'irr_std': np.nanstd(irrs),
             'roi_mean': np.nanmean(rois), 'roi_std': np.nanstd(rois),
             'breakeven_years_mean': np.nanmean(breakevens),
-            'prob_positive_net_worth': np.mean([e > 0 for e in endings['net_worth']])
+            'prob_positive_net_worth': (endings['net_worth'] > 0).mean()
         }
         return stats
 
-    def plot_cumulative_cash_flows(self, title: str = "Cumulative Cash Flows"):
-        def get_color(fraction):
-            if fraction <= 0.5:
-                val = fraction / 0.5
-                r = 1
-                g = val
-                b = val
-            else:
-                val = (fraction - 0.5) / 0.5
-                r = 1 - val
-                g = 1 - val
-                b = 1
-            return (r, g, b)
-
-        dfs = [self.to_dataframe(sim) for sim in self.sims]
-        endings_net = [df['cumulative_cash'].iloc[-1] + df['property_value'].iloc[-1] for df in dfs]
-        sorted_indices = np.argsort(endings_net)
-        positions = np.linspace(0, len(self.sims) - 1, 11, dtype=int)
-        selected_indices = sorted_indices[positions]
-
-        min_x = min(df.index.min() for df in dfs)
-        max_x = max(df.index.max() for df in dfs)
+    def _plot_percentiles(self, column: str, ylabel: str, title: str, rank_by: Optional[str] = None):
+        dfs, sorted_indices, selected_indices, min_x, max_x = self._get_selection(rank_by)
+        # One column lookup per simulation, reused by the background and percentile lines
+        series = [(df.index, df[column].to_numpy()) for df in dfs]
 
         plt.figure(figsize=(12, 6))
-        for df in dfs:
-            plt.plot(df.index, df['cumulative_cash'], color='black', alpha=0.1)
-
         for i in reversed(range(11)):
             idx = selected_indices[i]
             percentile = i * 10
             label = f"{percentile}th percentile ({self.sims[idx].name})"
-            color = get_color(i / 10.0)
-            plt.plot(dfs[idx].index, dfs[idx]['cumulative_cash'], color=color, label=label)
+            plt.plot(*series[idx], color=_PCT_COLORS[i], label=label)
 
-        plt.title(title)
-        plt.xlabel("Time")
-        plt.ylabel("Cumulative Cash")
-        plt.xlim(min_x, max_x)
-        plt.margins(x=0)
-        plt.legend()
-        plt.grid(True)
-        plt.show()
-
-    def plot_property_values(self, title: str = "Property Values Over Time"):
-        def get_color(fraction):
-            if fraction <= 0.5:
-                val = fraction / 0.5
-                r = 1
-                g = val
-                b = val
-            else:
-                val = (fraction - 0.5) / 0.5
-                r = 1 - val
-                g = 1 - val
-                b = 1
-            return (r, g, b)
-
-        dfs = [self.to_dataframe(sim) for sim in self.sims]
-        endings_net = [df['cumulative_cash'].iloc[-1] + df['property_value'].iloc[-1] for df in dfs]
-        sorted_indices = np.argsort(endings_net)
-        positions = np.linspace(0, len(self.sims) - 1, 11, dtype=int)
-        selected_indices = sorted_indices[positions]
-
-        min_x = min(df.index.min() for df in dfs)
-        max_x = max(df.index.max() for df in dfs)
-
-        plt.figure(figsize=(12, 6))
-        for df in dfs:
-            plt.plot(df.index, df['property_value'], color='black', alpha=0.1)
-
-        for i in reversed(range(11)):
-            idx = selected_indices[i]
-            percentile = i * 10
-            label = f"{percentile}th percentile ({self.sims[idx].name})"
-            color = get_color(i / 10.0)
-            plt.plot(dfs[idx].index, dfs[idx]['property_value'], color=color, label=label)
+        # Every path as one LineCollection instead of one Line2D per simulation; drawn
+        # beneath the percentile lines (lower zorder) as before
+        ax = plt.gca()
+        paths = [np.column_stack((mdates.date2num(x), y)) for x, y in series]
+        ax.add_collection(LineCollection(paths, colors='black', alpha=0.1, zorder=1))
+        ax.autoscale_view()
 
         plt.title(title)
         plt.xlabel("Time")
-        plt.ylabel("Property Value")
+        plt.ylabel(ylabel)
         plt.xlim(min_x, max_x)
         plt.margins(x=0)
         plt.legend()
         plt.grid(True)
         plt.show()
 
-    def plot_net_worth(self, title: str = "Net Worth Over Time Percentiles"):
-        def get_color(fraction):
-            if fraction <= 0.5:
-                val = fraction / 0.5
-                r = 1
-                g = val
-                b = val
-            else:
-                val = (fraction - 0.5) / 0.5
-                r = 1 - val
-                g = 1 - val
-                b = 1
-            return (r, g, b)
+    @staticmethod
+    def _breakeven_years(df: pd.DataFrame) -> float:
+        # argmax on the boolean mask finds the first positive row without filtering the frame
+        positive = df['net_worth'].to_numpy() > 0
+        if not positive.any():
+            return np.nan
+        return (df.index[positive.argmax()] - df.index.min()).days / 365.25
 
-        dfs = [self.to_dataframe(sim) for sim in self.sims]
-        endings = [df['net_worth'][-1] for df in dfs]
-        sorted_indices = np.argsort(endings)
-        positions = np.linspace(0, len(self.sims) - 1, 11, dtype=int)
-        selected_indices = sorted_indices[positions]
-
-        min_x = min(df.index.min() for df in dfs)
-        max_x = max(df.index.max() for df in dfs)
-
-        plt.figure(figsize=(12, 6))
-        for df in dfs:
-            plt.plot(df.index, df['net_worth'], color='black', alpha=0.1)
+    def plot_cumulative_cash_flows(self, title: str = "Cumulative Cash Flows"):
+        self._plot_percentiles('cumulative_cash', "Cumulative Cash", title)
 
-        for i in reversed(range(11)):
-            idx = selected_indices[i]
-            percentile = i * 10
-            label = f"{percentile}th percentile ({self.sims[idx].name})"
-            color = get_color(i / 10.0)
-            plt.plot(dfs[idx].index, dfs[idx]['net_worth'], color=color, label=label)
+    def plot_property_values(self, title: str = "Property Values Over Time"):
+        self._plot_percentiles('property_value', "Property Value", title)
 
-        plt.title(title)
-        plt.xlabel("Time")
-        plt.ylabel("Net Worth")
-        plt.xlim(min_x, max_x)
-        plt.margins(x=0)
-        plt.legend()
-        plt.grid(True)
-        plt.show()
+    def plot_net_worth(self, title: str = "Net Worth Over Time Percentiles"):
+        self._plot_percentiles('net_worth', "Net Worth", title, rank_by='net_worth')
 
     def plot_histogram_end_values(self, title: str = "Distribution of Ending Net Worth"):
-        endings = [self.to_dataframe(sim)['net_worth'][-1] for sim in self.sims]
+        endings = np.fromiter((self.to_dataframe(sim)['net_worth'].iat[-1] for sim in self.sims),
+                              dtype=np.float64, count=len(self.sims))
         plt.figure(figsize=(10, 5))
         plt.hist(endings, bins=20, edgecolor='black')
         plt.title(title)
@@ -271,7 +318,7 @@ class SimulationAnalyzer:
         for sim in self.sims:
             row = sim.params.copy()
             df = self.to_dataframe(sim)
-            row['ending_net_worth'] = df['net_worth'][-1]
+            row['ending_net_worth'] = df['net_worth'].iat[-1]
             row['irr'] = self.compute_irr(sim)
             row['roi'] = self.compute_roi(sim)
             data.append(row)
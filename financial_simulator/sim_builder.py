@@ -1,28 +1,306 @@
 from typing import List, Dict, Callable, Any, Optional
+import datetime as dt
+import os
+import numba
 import numpy as np
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import Executor, ProcessPoolExecutor
 from functools import partial
 
 from .sim import Simulation
-from .utils import Distribution
+from .state_log import StateLog
+from .event_log import EventLog
+from .event_builder import ComposedEventBuilder
+from .continuous_process import AppreciationProcess
+from .time_generator import Timing, RandomTiming, SeasonalTiming
+from .value_generator import (FixedValue, GrowingValue, DistributionValue, RateChangeValue, VariableRateLoanValue,
+                              VariableRateLoanBatch, growth_series)
+from .utils import seed_rng, Distribution, NormalDistribution, UniformDistribution, TriangularDistribution
 
 
-def _build_one(factory: Callable[[Dict[str, Any]], Simulation], param_distributions: Dict[str, Distribution], base_seed: Optional[int], i: int) -> Simulation:
-    if base_seed is not None:
-        np.random.seed(base_seed + i)
-    params = {k: v.sample() for k, v in param_distributions.items()}
+def _sample_params(param_distributions: Dict[str, Distribution], num: int) -> List[Dict[str, Any]]:
+    """Pre-draws every parameter for all `num` simulations with one sized call per distribution."""
+    keys = list(param_distributions)
+    if not keys:
+        return [{} for _ in range(num)]
+    # tolist converts each column to Python scalars in C; rows are then zipped into dicts
+    columns = [param_distributions[k].sample_n(num).tolist() for k in keys]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _build_one(factory: Callable[[Dict[str, Any]], Simulation], i: int, params: Dict[str, Any],
+               seed_seq: np.random.SeedSequence) -> Simulation:
+    # Each simulation gets its own spawned stream, so results do not depend on which
+    # worker runs it or on the state a forked worker inherited
+    np.random.seed(seed_seq.generate_state(1)[0])
+    seed_rng(seed_seq)
     sim = factory(params)
     sim.name = f"Sim_{i}"
     sim.run()
     return sim
 
+
+def _is_random(timing: Timing) -> bool:
+    if isinstance(timing, SeasonalTiming):
+        return _is_random(timing.inner)
+    return isinstance(timing, RandomTiming)
+
+
+def _draw(dists: List[Distribution], rng: np.random.Generator) -> np.ndarray:
+    """Draws one sample per path, in a single call when the distributions share a type."""
+    first = dists[0]
+    if all(type(d) is type(first) for d in dists):
+        if isinstance(first, NormalDistribution):
+            return rng.normal([d.mean for d in dists], [d.std for d in dists])
+        if isinstance(first, UniformDistribution):
+            return rng.uniform([d.low for d in dists], [d.high for d in dists])
+        if isinstance(first, TriangularDistribution):
+            return rng.triangular([d.low for d in dists], [d.mode for d in dists], [d.high for d in dists])
+    return np.array([d.sample() for d in dists], dtype=np.float64)
+
+
+class _BatchValue:
+    """Advances the value generators of one builder across all paths at once.
+
+    `step` records one occurrence for every path; `finish` returns the (N, K) cash values
+    and, when the generator emits any, the per-path lists of extra metadata, matching what
+    `ValueGenerator.get_value` would have returned for each simulation.
+    """
+    def __init__(self, gens: List, rng: np.random.Generator):
+        self.gens = gens
+        self.rng = rng
+        self.n = len(gens)
+        self.kind = type(gens[0])
+        self.columns = []
+        if any(type(g) is not self.kind for g in gens):
+            raise ValueError("Vectorized build requires every simulation to share value generator types")
+        if self.kind is FixedValue:
+            self.value = np.array([g.value for g in gens], dtype=np.float64)
+        elif self.kind is GrowingValue:
+            self.initial = np.array([g.initial for g in gens], dtype=np.float64)
+            self.growth = np.array([g.growth_rate for g in gens], dtype=np.float64)
+            self.times = []
+        elif self.kind is VariableRateLoanValue:
+            self.initial_rate = np.array([g.initial_rate for g in gens], dtype=np.float64)
+            self.rate_key = self._shared(gens, 'rate_key')
+            self.loan = VariableRateLoanBatch([g.principal for g in gens], [g.term_months for g in gens])
+            self.outputs = []
+        elif self.kind is RateChangeValue:
+            self.update_key = self._shared(gens, 'update_key')
+        elif self.kind is not DistributionValue:
+            raise ValueError(f"Unsupported value generator for vectorized build: {self.kind.__name__}")
+
+    @staticmethod
+    def _shared(gens: List, attr: str) -> Any:
+        # A state key is applied to every path at once, so it must be the same on all of them
+        value = getattr(gens[0], attr)
+        if any(getattr(g, attr) != value for g in gens):
+            raise ValueError(f"Vectorized build requires every simulation to share {attr}")
+        return value
+
+    def step(self, time: dt.datetime, state: Dict[str, np.ndarray]):
+        if self.kind is FixedValue:
+            self.columns.append(self.value)
+        elif self.kind is GrowingValue:
+            self.times.append(time)
+        elif self.kind is DistributionValue:
+            self.columns.append(_draw([g.dist for g in self.gens], self.rng))
+        elif self.kind is RateChangeValue:
+            new_rate = _draw([g.dist for g in self.gens], self.rng)
+            state[self.update_key] = new_rate
+            self.columns.append(new_rate)
+        else:
+            current_rate = state.get(self.rate_key)
+            if current_rate is None:
+                current_rate = self.initial_rate
+            else:
+                current_rate = np.where(np.isnan(current_rate), self.initial_rate, current_rate)
+            payment, interest, principal_pay, active = self.loan.step(current_rate)
+            self.columns.append(-payment)
+            self.outputs.append((interest, principal_pay, current_rate, self.loan.balance, active))
+
+    def finish(self):
+        if self.kind is GrowingValue:
+            step_days = [(b - a).days for a, b in zip(self.times, self.times[1:])]
+            years = np.cumsum([0] + step_days) / 365.25 if self.times else np.empty(0)
+            return growth_series(self.initial, self.growth, years), None
+        recorded = np.stack(self.columns, axis=1) if self.columns else np.empty((self.n, 0))
+        if self.kind is RateChangeValue:
+            key = self.update_key
+            extras = [[{'update_state': {key: r}} for r in row] for row in recorded.tolist()]
+            return np.zeros_like(recorded), extras
+        if self.kind is not VariableRateLoanValue:
+            return recorded, None
+        if not self.outputs:
+            return recorded, [[] for _ in range(self.n)]
+        # (N, K) per-step loan outputs, converted once to nested lists for the metadata dicts
+        interest, principal_paid, rates, balances, active = (
+            np.stack(col, axis=1).tolist() for col in zip(*self.outputs))
+        extras = [
+            [{'interest': it, 'principal': p, 'rate': c, 'remaining_balance': b} if a else {}
+             for a, it, p, c, b in zip(*rows)]
+            for rows in zip(active, interest, principal_paid, rates, balances)
+        ]
+        return recorded, extras
+
+
 class SimulationBuilder:
-    def __init__(self, factory: Callable[[Dict[str, Any]], Simulation], param_distributions: Dict[str, Distribution]):
+    def __init__(self, factory: Callable[[Dict[str, Any]], Simulation], param_distributions: Dict[str, Distribution],
+                 num_threads: Optional[int] = None):
         self.factory = factory
         self.param_distributions = param_distributions
+        self.num_threads = num_threads
+
+    def build_simulations(self, num: int, seed: Optional[int] = None, mode: str = 'process',
+                          executor: Optional[Executor] = None,
+                          progress: Optional[Callable[[int, int], None]] = None) -> List[Simulation]:
+        """Builds and runs `num` simulations.
+
+        mode='process' runs each factory-built simulation in a process pool and works for any
+        picklable factory; pass a long-lived `executor` to reuse its workers across calls
+        instead of starting a pool per call. `progress(done, num)` is called in this process
+        as finished simulations come back. mode='numba-threaded' runs the shared-schedule
+        vectorized path in-process, with the numeric kernels threaded over paths by numba.
+        """
+        if mode == 'numba-threaded':
+            return self.build_simulations_vectorized(num, seed)
+        if mode != 'process':
+            raise ValueError(f"Unknown build mode: {mode}")
+        if seed is not None:
+            np.random.seed(seed)
+            seed_rng(seed)
+        all_params = _sample_params(self.param_distributions, num)
+        seed_seqs = np.random.SeedSequence(seed).spawn(num)
+        build_func = partial(_build_one, self.factory)
+        chunksize = max(1, num // (4 * (os.cpu_count() or 1)))
+        if executor is not None:
+            return self._collect(executor, build_func, num, all_params, seed_seqs, chunksize, progress)
+        with ProcessPoolExecutor() as pool:
+            return self._collect(pool, build_func, num, all_params, seed_seqs, chunksize, progress)
+
+    @staticmethod
+    def _collect(executor: Executor, build_func: Callable, num: int, all_params: List[Dict[str, Any]],
+                 seed_seqs: List[np.random.SeedSequence], chunksize: int,
+                 progress: Optional[Callable[[int, int], None]]) -> List[Simulation]:
+        results = executor.map(build_func, range(num), all_params, seed_seqs, chunksize=chunksize)
+        if progress is None:
+            return list(results)
+        sims = []
+        for sim in results:
+            sims.append(sim)
+            progress(len(sims), num)
+        return sims
+
+    def build_simulations_vectorized(self, num: int, seed: Optional[int] = None) -> List[Simulation]:
+        """Runs all paths as one NumPy sweep over the shared event time grid.
+
+        Every simulation produced by the factory must share the same event schedule (only
+        the sampled values may differ), so builders with RandomTiming are not supported;
+        use build_simulations for those.
+        """
+        if self.num_threads is not None:
+            numba.set_num_threads(self.num_threads)
+        # Independent streams for the parameter draws and the per-tick draws; seeding both
+        # from the same seed would make the tick draws replay the parameters
+        param_seq, tick_seq = np.random.SeedSequence(seed).spawn(2)
+        if seed is not None:
+            np.random.seed(seed)
+            seed_rng(param_seq)
+        rng = np.random.default_rng(tick_seq)
+        sims = []
+        for i, params in enumerate(_sample_params(self.param_distributions, num)):
+            sim = self.factory(params)
+            sim.name = f"Sim_{i}"
+            sims.append(sim)
+
+        proto = sims[0]
+        if not all(isinstance(b, ComposedEventBuilder) for b in proto.event_builders):
+            raise ValueError("Vectorized build only supports ComposedEventBuilder")
+        if any(_is_random(b.timing) for b in proto.event_builders):
+            raise ValueError("Vectorized build requires a schedule shared by all simulations")
+        # The grid comes from the prototype alone, so timings built from sampled params
+        # (e.g. a OneTimeTiming at a drawn date) must be rejected rather than silently aligned
+        proto_timings = [b.timing.to_json_dict() for b in proto.event_builders]
+        for sim in sims[1:]:
+            builders = sim.event_builders
+            if ((sim.start, sim.end) != (proto.start, proto.end) or len(builders) != len(proto_timings)
+                    or any(not isinstance(b, ComposedEventBuilder) or b.timing.to_json_dict() != t
+                           for b, t in zip(builders, proto_timings))):
+                raise ValueError(f"Vectorized build requires a schedule shared by all simulations: "
+                                 f"{sim.name} differs from {proto.name}; use build_simulations instead")
+
+        # One pass over the prototype's timings gives the common time grid
+        schedules = [set(b.timing.schedule(proto.start, proto.end).tolist()) for b in proto.event_builders]
+        times = sorted({proto.start}.union(*schedules))
+        num_times = len(times)
+        grid = np.array(times, dtype='datetime64[s]')
+        firing = [[j for j, sched in enumerate(schedules) if t in sched] for t in times]
+
+        batches = [_BatchValue([s.event_builders[j].value_gen for s in sims], rng)
+                   for j in range(len(proto.event_builders))]
+        keys = list(dict.fromkeys(k for s in sims for k in s.state))
+        # Keys RateChange builders write at runtime, in the order run() first records them;
+        # NaN until set, as in a StateLog column added mid-run
+        runtime_keys = list(dict.fromkeys(
+            proto.event_builders[j].value_gen.update_key for c in range(num_times) for j in firing[c]
+            if isinstance(proto.event_builders[j].value_gen, RateChangeValue)))
+        keys += [k for k in runtime_keys if k not in keys]
+        state = {k: np.array([s.state.get(k, np.nan) for s in sims], dtype=np.float64) for k in keys}
+
+        # Appreciation factors for every grid step, computed in one broadcast
+        days = np.concatenate(([0], np.diff(grid) // np.timedelta64(1, 'D')))
+        appreciation = []
+        for p, proc in enumerate(proto.continuous_processes):
+            if not isinstance(proc, AppreciationProcess):
+                raise ValueError(f"Unsupported continuous process for vectorized build: {type(proc).__name__}")
+            per_day = np.array([s.continuous_processes[p]._log1p_rate_per_day for s in sims])
+            appreciation.append((proc.var, np.exp(per_day[:, None] * days[None, :])))
+
+        initial_cash = state.get('cumulative_cash')
+        history = {k: np.empty((num, num_times)) for k in keys}
+        for c, t in enumerate(times):
+            for var, factors in appreciation:
+                if var in state:
+                    state[var] = state[var] * factors[:, c]
+            for j in firing[c]:
+                batches[j].step(t, state)
+            for k in keys:
+                history[k][:, c] = state[k]
+
+        # Occurrence k of builder j lands on grid column columns[j][k]
+        columns = [[] for _ in batches]
+        for c in range(num_times):
+            for j in firing[c]:
+                columns[j].append(c)
+        cashflow = np.zeros((num, num_times))
+        outputs = []
+        for j, batch in enumerate(batches):
+            values, extras = batch.finish()
+            cashflow[:, columns[j]] += values
+            outputs.append((values, extras))
+        if initial_cash is not None:
+            history['cumulative_cash'] = initial_cash[:, None] + np.cumsum(cashflow, axis=1)
+
+        # Events in engine order (grid column, then builder index); the layout is shared by all
+        # paths, so values fill one (N, E) matrix and only the metadata is assembled per path
+        event_builder = [j for c in range(num_times) for j in firing[c]]
+        event_times = np.array(times, dtype='datetime64[us]')[[c for c in range(num_times) for _ in firing[c]]]
+        slots = [[] for _ in batches]  # slots[j][k]: event position of occurrence k of builder j
+        for pos, j in enumerate(event_builder):
+            slots[j].append(pos)
+        event_values = np.empty((num, len(event_builder)))
+        for j, (values, _) in enumerate(outputs):
+            event_values[:, slots[j]] = values
 
-    def build_simulations(self, num: int, seed: Optional[int] = None) -> List[Simulation]:
-        build_func = partial(_build_one, self.factory, self.param_distributions, seed)
-        with ProcessPoolExecutor() as executor:
-            sims = list(executor.map(build_func, range(num)))
-        return sims
\ No newline at end of file
+        for i, sim in enumerate(sims):
+            metas = [b.metadata for b in sim.event_builders]
+            metadata = [metas[j] for j in event_builder]
+            for j, (_, extras) in enumerate(outputs):
+                if extras:
+                    for pos, extra in zip(slots[j], extras[i]):
+                        if extra:
+                            metadata[pos] = {**metas[j], **extra}
+            sim.events = EventLog.from_columns(event_times, event_values[i], metadata)
+            sim_keys = [k for k in keys if k in sim.state] + [k for k in runtime_keys if k not in sim.state]
+            sim.state_history = StateLog.from_columns(grid, {k: history[k][i] for k in sim_keys})
+            sim.state = {k: float(history[k][i, -1]) for k in sim_keys}
+        return sims
@@ -0,0 +1,85 @@
+import datetime as dt
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class StateLog:
+    """Columnar state history: one datetime64 array plus one float64 column per state key.
+
+    Rows are written in place into preallocated buffers that grow by doubling, so recording
+    a step allocates nothing. Recording the same time twice overwrites the previous row,
+    matching the old time-keyed dict semantics.
+    """
+    def __init__(self, capacity: int = 64):
+        self._times = np.empty(capacity, dtype='datetime64[s]')
+        self._columns: Dict[str, np.ndarray] = {}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self.size]
+
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, key: str) -> np.ndarray:
+        return self._columns[key][:self.size]
+
+    def append(self, time: dt.datetime, state: Dict[str, float]):
+        t = np.datetime64(time, 's')
+        if self.size and self._times[self.size - 1] == t:
+            row = self.size - 1
+        else:
+            if self.size == len(self._times):
+                self._grow()
+            row = self.size
+            self._times[row] = t
+            self.size += 1
+        for k, v in state.items():
+            col = self._columns.get(k)
+            if col is None:
+                col = self._columns[k] = np.full(len(self._times), np.nan)
+            col[row] = v
+
+    def __getstate__(self) -> Dict:
+        # Drop unused capacity so pickles only carry recorded rows
+        return {'_times': self.times, '_columns': {k: self.column(k) for k in self._columns}, 'size': self.size}
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+
+    def _grow(self):
+        capacity = max(2 * len(self._times), 1)
+        times = np.empty(capacity, dtype='datetime64[s]')
+        times[:self.size] = self._times[:self.size]
+        self._times = times
+        for k, col in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:self.size] = col[:self.size]
+            self._columns[k] = grown
+
+    @classmethod
+    def from_columns(cls, times: np.ndarray, columns: Dict[str, np.ndarray]) -> 'StateLog':
+        """Wraps existing arrays (e.g. row slices of a path matrix) without copying."""
+        log = cls(0)
+        log._times = np.asarray(times, dtype='datetime64[s]')
+        log._columns = {k: np.asarray(v, dtype=np.float64) for k, v in columns.items()}
+        log.size = len(log._times)
+        return log
+
+    def to_dict(self) -> Dict:
+        # Integer epoch seconds round-trip without any per-element string formatting or parsing
+        return {
+            'times_epoch_s': self.times.astype(np.int64).tolist(),
+            'columns': {k: self.column(k).tolist() for k in self._columns},
+        }
+
+    @classmethod
+    def from_dict(cls, d: Optional[Dict]) -> 'StateLog':
+        if not d:
+            return cls()
+        times = np.asarray(d['times_epoch_s'], dtype=np.int64).astype('datetime64[s]')
+        return cls.from_columns(times, d['columns'])
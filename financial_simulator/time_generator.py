@@ -1,10 +1,12 @@
 import datetime as dt
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Dict
 import numpy as np
 
 
 class Timing(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def reset(self):
         pass
@@ -13,8 +15,34 @@ class Timing(ABC):
     def next_time(self, current: dt.datetime, end: dt.datetime) -> Optional[dt.datetime]:
         pass
 
+    @abstractmethod
+    def advance(self, time: dt.datetime):
+        """Marks the occurrence at `time` as consumed so next_time moves past it.
+
+        Required: the engine relies on it to step forward and would otherwise loop forever.
+        """
+        pass
+
+    @abstractmethod
+    def to_json_dict(self) -> Dict:
+        """Plain-JSON description in the schema accepted by create_timing."""
+        pass
+
+    def schedule(self, start: dt.datetime, end: dt.datetime) -> np.ndarray:
+        """Returns every occurrence between start and end as a datetime64[us] array."""
+        self.reset()
+        times = []
+        t = self.next_time(start, end)
+        while t is not None:
+            times.append(t)
+            self.advance(t)
+            t = self.next_time(t, end)
+        return np.array(times, dtype='datetime64[us]')
+
 
 class OneTimeTiming(Timing):
+    __slots__ = ('time', 'fired')
+
     def __init__(self, time: dt.datetime):
         self.time = time
         self.fired = False
@@ -27,8 +55,16 @@ class OneTimeTiming(Timing):
             return self.time
         return None
 
+    def advance(self, time: dt.datetime):
+        self.fired = True
+
+    def to_json_dict(self) -> Dict:
+        return {'type': 'OneTime', 'time': self.time.isoformat()}
+
 
 class IntervalTiming(Timing):
+    __slots__ = ('interval', 'start_time', 'current_next')
+
     def __init__(self, interval: dt.timedelta, start_time: Optional[dt.datetime] = None):
         self.interval = interval
         self.start_time = start_time
@@ -40,50 +76,121 @@ class IntervalTiming(Timing):
     def next_time(self, current: dt.datetime, end: dt.datetime) -> Optional[dt.datetime]:
         if self.current_next is None:
             self.current_next = current + self.interval if self.start_time is None else self.start_time
-        while self.current_next < current:
-            self.current_next += self.interval
+        if self.current_next < current:
+            # Jump straight to the first occurrence >= current; timedelta // timedelta is exact
+            steps = -((self.current_next - current) // self.interval)
+            self.current_next += self.interval * steps
         if self.current_next > end:
             return None
         return self.current_next
 
-    # Advance is handled in builder after generate
+    def advance(self, time: dt.datetime):
+        self.current_next = time + self.interval
+
+    def schedule(self, start: dt.datetime, end: dt.datetime) -> np.ndarray:
+        first = start + self.interval if self.start_time is None else self.start_time
+        if first < start:
+            first += self.interval * -((first - start) // self.interval)
+        n = (end - first) // self.interval + 1 if first <= end else 0
+        step = np.timedelta64(self.interval, 'us')
+        return np.datetime64(first, 'us') + step * np.arange(n)
+
+    def to_json_dict(self) -> Dict:
+        d = {'type': 'Interval', 'interval_days': self.interval / dt.timedelta(days=1)}
+        if self.start_time is not None:
+            d['start_time'] = self.start_time.isoformat()
+        return d
 
 
 class RandomTiming(Timing):
+    __slots__ = ('start', 'end', 'n', 'distribution', 'times', 'index')
+
     def __init__(self, start: dt.datetime, end: dt.datetime, n: int, distribution: str = 'uniform'):
         self.start = start
         self.end = end
         self.n = n
         self.distribution = distribution
-        self.times = []
+        self.times = np.empty(0, dtype='datetime64[us]')
         self.index = 0
 
     def reset(self):
         delta_days = (self.end - self.start).days
         if self.distribution == 'uniform':
-            random_days = sorted(np.random.randint(0, delta_days + 1, self.n))
-            self.times = [self.start + dt.timedelta(days=d) for d in random_days]
+            random_days = np.random.randint(0, delta_days + 1, self.n)
+            random_days.sort()
+            # Microsecond resolution so .item() hands back dt.datetime
+            self.times = np.datetime64(self.start, 'us') + random_days.astype('timedelta64[D]')
         # Add other distributions if needed
         self.index = 0
 
     def next_time(self, current: dt.datetime, end: dt.datetime) -> Optional[dt.datetime]:
-        while self.index < len(self.times) and self.times[self.index] < current:
-            self.index += 1
-        if self.index < len(self.times) and self.times[self.index] <= end:
-            return self.times[self.index]
+        n = len(self.times)
+        if self.index < n and self.times[self.index] < np.datetime64(current, 'us'):
+            self.index = int(np.searchsorted(self.times, np.datetime64(current, 'us'), side='left'))
+        if self.index < n:
+            t = self.times[self.index].item()
+            if t <= end:
+                return t
         return None
 
+    def advance(self, time: dt.datetime):
+        self.index += 1
+
+    def schedule(self, start: dt.datetime, end: dt.datetime) -> np.ndarray:
+        self.reset()
+        lo = np.searchsorted(self.times, np.datetime64(start, 'us'), side='left')
+        hi = np.searchsorted(self.times, np.datetime64(end, 'us'), side='right')
+        return self.times[lo:hi]
+
+    def to_json_dict(self) -> Dict:
+        return {'type': 'Random', 'start': self.start.isoformat(), 'end': self.end.isoformat(),
+                'n': int(self.n), 'distribution': self.distribution}
+
 
 class SeasonalTiming(Timing):
+    __slots__ = ('inner', 'months', '_month_array')
+
     def __init__(self, inner: Timing, months: list[int]):
         self.inner = inner
-        self.months = set(months)
+        self.months = frozenset(months)
+        self._month_array = np.array(sorted(self.months), dtype=np.int64)
 
     def reset(self):
         self.inner.reset()
+        if isinstance(self.inner, RandomTiming):
+            # Drop out-of-season draws up front so next_time never has to skip them
+            times = self.inner.times
+            months = times.astype('datetime64[M]').astype(np.int64) % 12 + 1
+            self.inner.times = times[np.isin(months, self._month_array)]
+
+    def _next_season_start(self, time: dt.datetime) -> Optional[dt.datetime]:
+        """First instant of the next in-season month strictly after time's month."""
+        if not len(self._month_array):
+            return None
+        i = np.searchsorted(self._month_array, time.month, side='right')
+        if i < len(self._month_array):
+            return dt.datetime(time.year, int(self._month_array[i]), 1, tzinfo=time.tzinfo)
+        return dt.datetime(time.year + 1, int(self._month_array[0]), 1, tzinfo=time.tzinfo)
 
     def next_time(self, current: dt.datetime, end: dt.datetime) -> Optional[dt.datetime]:
         nt = self.inner.next_time(current, end)
         while nt is not None and nt.month not in self.months:
-            nt = self.inner.next_time(nt, end)
-        return nt
\ No newline at end of file
+            # Ask the inner timing for its first occurrence from the next valid month on,
+            # instead of stepping through every out-of-season occurrence
+            season_start = self._next_season_start(nt)
+            if season_start is None or season_start > end:
+                return None
+            nt = self.inner.next_time(season_start, end)
+        return nt
+
+    def advance(self, time: dt.datetime):
+        self.inner.advance(time)
+
+    def schedule(self, start: dt.datetime, end: dt.datetime) -> np.ndarray:
+        times = self.inner.schedule(start, end)
+        months = times.astype('datetime64[M]').astype(np.int64) % 12 + 1
+        return times[np.isin(months, self._month_array)]
+
+    def to_json_dict(self) -> Dict:
+        return {'type': 'Seasonal', 'months': sorted(self.months), 'inner': self.inner.to_json_dict()}
+
@@ -1,27 +1,65 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+import functools
+from dataclasses import dataclass, field
 import numpy as np
 import datetime as dt
-from typing import Dict
+from typing import Dict, Optional
+
+
+# Shared PCG64 stream for every distribution that is not given its own generator
+_RNG = np.random.default_rng()
+
+
+def seed_rng(seed: Optional[int] = None):
+    """Reseeds the shared generator used by Distribution.sample/sample_n."""
+    global _RNG
+    _RNG = np.random.default_rng(seed)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_datetime(value: str) -> dt.datetime:
+    """Cached fromisoformat: templates repeat the same timestamps across every Monte Carlo sim.
+
+    Safe to share because datetimes are immutable.
+    """
+    return dt.datetime.fromisoformat(value)
 
 
 class Distribution(ABC):
-    """Abstract base for parameter distributions in Monte Carlo."""
+    """Abstract base for parameter distributions in Monte Carlo.
+
+    Subclasses draw from `self.rng` when set (e.g. for deterministic tests) and from the
+    shared module generator otherwise.
+    """
+    __slots__ = ()
+    rng: Optional[np.random.Generator] = None
+
+    def _generator(self) -> np.random.Generator:
+        return _RNG if self.rng is None else self.rng
+
     @abstractmethod
     def sample(self) -> float:
         pass
 
+    def sample_n(self, n: int) -> np.ndarray:
+        """Draws n samples at once; subclasses override with a single sized NumPy call."""
+        return np.array([self.sample() for _ in range(n)])
+
     @abstractmethod
     def to_dict(self) -> Dict:
         pass
 
-@dataclass
+@dataclass(slots=True)
 class NormalDistribution(Distribution):
     mean: float
     std: float
+    rng: Optional[np.random.Generator] = field(default=None, repr=False, compare=False)
 
     def sample(self) -> float:
-        return np.random.normal(self.mean, self.std)
+        return self._generator().normal(self.mean, self.std)
+
+    def sample_n(self, n: int) -> np.ndarray:
+        return self._generator().normal(self.mean, self.std, size=n)
 
     def to_dict(self) -> Dict:
         return {'type': 'NormalDistribution', 'mean': self.mean, 'std': self.std}
@@ -30,13 +68,17 @@ class NormalDistribution(Distribution):
     def from_dict(cls, d: Dict) -> 'NormalDistribution':
         return cls(d['mean'], d['std'])
 
-@dataclass
+@dataclass(slots=True)
 class UniformDistribution(Distribution):
     low: float
     high: float
+    rng: Optional[np.random.Generator] = field(default=None, repr=False, compare=False)
 
     def sample(self) -> float:
-        return np.random.uniform(self.low, self.high)
+        return self._generator().uniform(self.low, self.high)
+
+    def sample_n(self, n: int) -> np.ndarray:
+        return self._generator().uniform(self.low, self.high, size=n)
 
     def to_dict(self) -> Dict:
         return {'type': 'UniformDistribution', 'low': self.low, 'high': self.high}
@@ -45,15 +87,19 @@ class UniformDistribution(Distribution):
     def from_dict(cls, d: Dict) -> 'UniformDistribution':
         return cls(d['low'], d['high'])
 
-@dataclass
+@dataclass(slots=True)
 class TriangularDistribution(Distribution):
     """For costs with low/mode/high estimates."""
     low: float
     mode: float
     high: float
+    rng: Optional[np.random.Generator] = field(default=None, repr=False, compare=False)
 
     def sample(self) -> float:
-        return np.random.triangular(self.low, self.mode, self.high)
+        return self._generator().triangular(self.low, self.mode, self.high)
+
+    def sample_n(self, n: int) -> np.ndarray:
+        return self._generator().triangular(self.low, self.mode, self.high, size=n)
 
     def to_dict(self) -> Dict:
         return {'type': 'TriangularDistribution', 'low': self.low, 'mode': self.mode, 'high': self.high}
@@ -64,21 +110,30 @@ class TriangularDistribution(Distribution):
 
 class DateDistribution(Distribution):
     """Samples dates between start and end."""
-    def __init__(self, start: dt.datetime, end: dt.datetime):
+    __slots__ = ('start', 'end', 'rng')
+
+    def __init__(self, start: dt.datetime, end: dt.datetime, rng: Optional[np.random.Generator] = None):
         self.start = start
         self.end = end
+        self.rng = rng
 
     def sample(self) -> dt.datetime:
         delta = (self.end - self.start).days
-        random_days = np.random.randint(0, delta + 1)
-        return self.start + dt.timedelta(days=random_days)
+        random_days = self._generator().integers(0, delta + 1)
+        return self.start + dt.timedelta(days=int(random_days))
+
+    def sample_n(self, n: int) -> np.ndarray:
+        # datetime64[us] so that .item() hands back dt.datetime rather than dt.date
+        delta = (self.end - self.start).days
+        random_days = self._generator().integers(0, delta + 1, size=n)
+        return np.datetime64(self.start, 'us') + random_days * np.timedelta64(1, 'D')
 
     def to_dict(self) -> Dict:
         return {'type': 'DateDistribution', 'start': self.start.isoformat(), 'end': self.end.isoformat()}
 
     @classmethod
     def from_dict(cls, d: Dict) -> 'DateDistribution':
-        return cls(dt.datetime.fromisoformat(d['start']), dt.datetime.fromisoformat(d['end']))
+        return cls(parse_datetime(d['start']), parse_datetime(d['end']))
 
 def create_distribution(d: Dict) -> Distribution:
     typ = d['type']
@@ -1,8 +1,10 @@
 import datetime as dt
 from abc import ABC, abstractmethod
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
+import numpy as np
 
 from .utils import Distribution
+from ._kernels import amortize_step, loan_step
 
 
 class ValueGenerator(ABC):
@@ -12,6 +14,16 @@ class ValueGenerator(ABC):
 
     @abstractmethod
     def get_value(self, time: dt.datetime, sim: 'Simulation') -> Tuple[float, Dict]:
+        """Returns (cash value, extra metadata) for the occurrence at `time`.
+
+        Callers merge the extra metadata into a new dict rather than keeping it, so a generator
+        may hand back the same dict on every call; values nested inside it are kept as-is.
+        """
+        pass
+
+    @abstractmethod
+    def to_json_dict(self) -> Dict:
+        """Plain-JSON description in the schema accepted by create_value_generator."""
         pass
 
 
@@ -25,49 +37,122 @@ class FixedValue(ValueGenerator):
     def get_value(self, time: dt.datetime, sim: 'Simulation') -> Tuple[float, Dict]:
         return self.value, {}
 
+    def to_json_dict(self) -> Dict:
+        return {'type': 'Fixed', 'value': float(self.value)}
+
 
 class GrowingValue(ValueGenerator):
-    def __init__(self, initial: float, growth_rate: float):
+    def __init__(self, initial: float, growth_rate: float, interval_days: Optional[int] = None):
         self.initial = initial
         self.growth_rate = growth_rate
+        # Whole days between occurrences when the timing guarantees even spacing, else None
+        self.interval_days = interval_days
         self.current = initial
         self.last_time = None
+        self.reset()
 
     def reset(self):
         self.current = self.initial
         self.last_time = None
+        self._steps = 0
+        if self.interval_days is not None:
+            self._step_days = self.interval_days
+            self._step_factor = (1 + self.growth_rate) ** (self.interval_days / 365.25)
+        else:
+            self._step_days = None
+            self._step_factor = 1.0
 
     def get_value(self, time: dt.datetime, sim: 'Simulation') -> Tuple[float, Dict]:
+        if self.interval_days is not None:
+            # Even spacing: a step counter stands in for the datetime subtraction
+            if self._steps:
+                self.current *= self._step_factor
+            self._steps += 1
+            return self.current, {}
         if self.last_time is not None:
-            delta_years = (time - self.last_time).days / 365.25
-            self.current *= (1 + self.growth_rate) ** delta_years
+            days = (time - self.last_time).days
+            # Occurrences are almost always evenly spaced, so the pow runs once per spacing
+            if days != self._step_days:
+                self._step_days = days
+                self._step_factor = (1 + self.growth_rate) ** (days / 365.25)
+            self.current *= self._step_factor
         self.last_time = time
         return self.current, {}
 
+    def to_json_dict(self) -> Dict:
+        d = {'type': 'Growing', 'initial': float(self.initial), 'growth_rate': float(self.growth_rate)}
+        if self.interval_days is not None:
+            d['interval_days'] = int(self.interval_days)
+        return d
+
+
+def growth_series(initial: np.ndarray, growth_rate: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Values of GrowingValue for (N,) paths at (K,) years since the first occurrence, as (N, K).
+
+    `years` should sum whole days per step, as GrowingValue.get_value does.
+    """
+    return initial[:, None] * np.power(1.0 + growth_rate[:, None], years[None, :])
+
+
+class _DrawBuffer:
+    """Serves scalar samples from blocks drawn with one sample_n call each.
+
+    Blocks start small and double, so short simulations waste few draws while long ones
+    make only a handful of RNG calls.
+    """
+    __slots__ = ('dist', 'draws', 'index', 'block')
+
+    def __init__(self, dist: Distribution):
+        self.dist = dist
+        self.reset()
+
+    def reset(self):
+        self.draws = []
+        self.index = 0
+        self.block = 16
+
+    def next(self) -> float:
+        if self.index == len(self.draws):
+            self.draws = self.dist.sample_n(self.block).tolist()
+            self.index = 0
+            self.block = min(2 * self.block, 4096)
+        value = self.draws[self.index]
+        self.index += 1
+        return value
+
 
 class DistributionValue(ValueGenerator):
     def __init__(self, dist: Distribution):
         self.dist = dist
+        self._draws = _DrawBuffer(dist)
 
     def reset(self):
-        pass
+        self._draws.reset()
 
     def get_value(self, time: dt.datetime, sim: 'Simulation') -> Tuple[float, Dict]:
-        return self.dist.sample(), {}
+        return self._draws.next(), {}
+
+    def to_json_dict(self) -> Dict:
+        return {'type': 'Distribution', 'dist': self.dist.to_dict()}
 
 
 class RateChangeValue(ValueGenerator):
     def __init__(self, dist: Distribution, update_key: str):
         self.dist = dist
         self.update_key = update_key
+        self._draws = _DrawBuffer(dist)
 
     def reset(self):
-        pass
+        self._draws.reset()
 
     def get_value(self, time: dt.datetime, sim: 'Simulation') -> Tuple[float, Dict]:
-        new_rate = self.dist.sample()
+        new_rate = self._draws.next()
+        # Fresh dicts each call: the update_state mapping is kept in the event's metadata
         return 0.0, {'update_state': {self.update_key: new_rate}}
 
+    def to_json_dict(self) -> Dict:
+        return {'type': 'RateChange', 'dist': self.dist.to_dict(), 'update_key': self.update_key}
+
 
 class VariableRateLoanValue(ValueGenerator):
     def __init__(self, principal: float, initial_rate: float, term_months: int, rate_key: str):
@@ -75,41 +160,69 @@ class VariableRateLoanValue(ValueGenerator):
         self.initial_rate = initial_rate
         self.term_months = term_months
         self.rate_key = rate_key
-        self.balance = principal
-        self.month = 0
-        self.last_time = None
+        # Loan state stays float so every loan_step call hits the same compiled signature
+        self._term = float(term_months)
+        self.balance = float(principal)
+        self.month = 0.0
+        # Annuity factor (1 + r/12) ** remaining from the last payment and the rate it used
+        self._rate = 0.0
+        self._growth = 0.0
+        self._meta = {}  # Refilled in place by get_value; the caller copies it into the event
 
     def reset(self):
-        self.balance = self.principal
-        self.month = 0
-        self.last_time = None
+        self.balance = float(self.principal)
+        self.month = 0.0
+        self._rate = 0.0
+        self._growth = 0.0
 
     def get_value(self, time: dt.datetime, sim: 'Simulation') -> Tuple[float, Dict]:
         if self.month >= self.term_months or self.balance <= 0:
             return 0.0, {}
-        if self.last_time is not None:
-            # Check if time is next interval, but assume called correctly
-            pass
-        current_rate = sim.state.get(self.rate_key, self.initial_rate)
-        monthly_rate = current_rate / 12
-        remaining_months = self.term_months - self.month
-        if monthly_rate == 0:
-            payment = self.balance / remaining_months
-        else:
-            r = (1 + monthly_rate) ** remaining_months
-            payment = self.balance * monthly_rate * r / (r - 1)
-        interest = self.balance * monthly_rate
-        principal_pay = payment - interest
-        if principal_pay > self.balance:
-            principal_pay = self.balance
-            payment = interest + principal_pay
-        self.balance -= principal_pay
-        self.month += 1
-        self.last_time = time
-        extra_meta = {
-            'interest': interest,
-            'principal': principal_pay,
-            'rate': current_rate,
-            'remaining_balance': self.balance
-        }
-        return -payment, extra_meta
\ No newline at end of file
+        current_rate = float(sim.state.get(self.rate_key, self.initial_rate))
+        payment, interest, principal_pay, self.balance, self._growth = loan_step(
+            self.balance, self.month, current_rate, self._term, self._rate, self._growth)
+        self._rate = current_rate
+        self.month += 1.0
+        meta = self._meta
+        meta['interest'] = interest
+        meta['principal'] = principal_pay
+        meta['rate'] = current_rate
+        meta['remaining_balance'] = self.balance
+        return -payment, meta
+
+    def to_json_dict(self) -> Dict:
+        return {'type': 'VariableRateLoan', 'principal': float(self.principal), 'initial_rate': float(self.initial_rate),
+                'term_months': float(self.term_months), 'rate_key': self.rate_key}
+
+
+class VariableRateLoanBatch:
+    """VariableRateLoanValue advanced for N Monte Carlo paths at once.
+
+    Holds (N,) balance and month arrays; each `step` makes one monthly payment on every
+    still-active path at that path's current rate, replacing N scalar get_value calls. The
+    arithmetic runs in the numba amortize_step kernel, threaded over paths.
+    """
+    def __init__(self, principal: np.ndarray, term_months: np.ndarray):
+        self.principal = np.asarray(principal, dtype=np.float64)
+        self.term_months = np.asarray(term_months, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        self.balance = self.principal.copy()
+        self.month = np.zeros_like(self.principal)
+        self.rate = np.zeros_like(self.principal)
+        self.growth = np.zeros_like(self.principal)
+
+    def step(self, annual_rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (payment, interest, principal, active); inactive paths pay zero."""
+        n = self.balance.shape[0]
+        payment = np.empty(n)
+        interest = np.empty(n)
+        principal_pay = np.empty(n)
+        active = np.empty(n, dtype=np.bool_)
+        # The kernel updates balance in place, so hand it a fresh array and keep returned
+        # balances from earlier steps intact
+        self.balance = self.balance.copy()
+        amortize_step(self.balance, self.month, np.ascontiguousarray(annual_rate, dtype=np.float64),
+                      self.term_months, self.rate, self.growth, payment, interest, principal_pay, active)
+        return payment, interest, principal_pay, active
@@ -1,5 +1,7 @@
+import io
 import requests
 import json
+import numpy as np
 import time
 import uuid
 import matplotlib.pyplot as plt
@@ -35,12 +37,12 @@ def send_and_monitor(server_url, config_file='config.json'):
         time.sleep(5)
     
     # Retrieve results
-    results_res = requests.get(f"{server_url}/results/{job_id}")
-    results = results_res.json()
+    results_res = requests.get(f"{server_url}/results/{job_id}", params={'format': 'npz'})
     
     # Process and plot (adapt from your sim_analyzer.py)
-    # Assuming results include list of sim dicts; recreate Simulations
-    sims = [fs.Simulation.from_dict(sim) for sim in results['sims']]
+    # Results arrive as packed columns; recreate Simulations from them
+    with np.load(io.BytesIO(results_res.content), allow_pickle=False) as results:
+        sims = fs.unpack_simulations(dict(results))
     analyzer = fs.SimulationAnalyzer(sims)
     stats = analyzer.compute_statistics()
     print("Global Metrics:", stats)
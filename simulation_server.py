@@ -1,35 +1,83 @@
-from typing import Dict, Any
-from flask import Flask, request, jsonify
+from typing import Dict, Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from flask import Flask, Response, request, jsonify
+import io
+import queue
 import threading
+import time
 import uuid
-import datetime as dt
-import copy
+import multiprocessing
+import os
+import numpy as np
+import orjson
 
 import financial_simulator as fs
+from financial_simulator.utils import parse_datetime
 
 
 app = Flask(__name__)
 
 jobs = {}
 
+# Jobs wait here and run one at a time; each one already fans out over a process pool
+JOB_QUEUE_SIZE = 16
+JOB_Q = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+# Seconds a finished job (and its results) is kept before eviction
+RESULT_TTL = 3600
+_consumer_lock = threading.Lock()
+_consumer = None
 
-def substitute(config: Any, params: Dict) -> Any:
-    if isinstance(config, dict):
-        return {k: substitute(v, params) for k, v in config.items()}
-    elif isinstance(config, list):
-        return [substitute(v, params) for v in config]
-    elif isinstance(config, str) and config.startswith('${') and config.endswith('}'):
-        key = config[2:-1]
-        return params.get(key)
-    return config
+# Set once per worker process by _init_worker, so tasks only carry per-simulation params
+TEMPLATE = None
 
 
-def create_simulation(params: Dict, base_config: Dict) -> fs.Simulation:
-    sub_config = substitute(copy.deepcopy(base_config['simulation']), params)
-    start = dt.datetime.fromisoformat(sub_config['start'])
-    end = dt.datetime.fromisoformat(sub_config['end'])
+def compile_template(config: Any) -> Tuple[Any, List[Tuple[tuple, str]]]:
+    """Walks the config once and returns it with the (path, param key) of every '${key}' slot."""
+    patches = []
+
+    def walk(node: Any, path: tuple):
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            return
+        for k, v in items:
+            if isinstance(v, str) and v.startswith('${') and v.endswith('}'):
+                patches.append((path + (k,), v[2:-1]))
+            else:
+                walk(v, path + (k,))
+
+    walk(config, ())
+    return config, patches
+
+
+def apply_template(skeleton: Any, patches: List[Tuple[tuple, str]], params: Dict) -> Any:
+    """Fills the slots for one simulation, copying only the containers on patched paths.
+
+    Everything else is shared with the skeleton, so callers must not mutate the result in place.
+    """
+    root = skeleton.copy()
+    copied = {(): root}
+    for path, key in patches:
+        node = root
+        for depth in range(1, len(path)):
+            child = copied.get(path[:depth])
+            if child is None:
+                child = copied[path[:depth]] = node[path[depth - 1]].copy()
+                node[path[depth - 1]] = child
+            node = child
+        node[path[-1]] = params.get(key)
+    return root
+
+
+def _simulation_from_config(sub_config: Dict, params: Dict) -> fs.Simulation:
+    # Every simulation of a job shares start/end, so the cached parser does the work once per worker
+    start = parse_datetime(sub_config['start'])
+    end = parse_datetime(sub_config['end'])
     sim = fs.Simulation(sub_config.get('name', 'GeneralSim'), start, end, params)
-    sim.state = sub_config.get('initial_state', {})
+    sim.state = dict(sub_config.get('initial_state', {}))  # Mutated by run(); never share the template's
     for proc_d in sub_config.get('continuous_processes', []):
         sim.add_continuous(fs.create_continuous_process(proc_d))
     for builder_d in sub_config.get('builders', []):
@@ -37,16 +85,49 @@ def create_simulation(params: Dict, base_config: Dict) -> fs.Simulation:
     return sim
 
 
+def create_simulation(params: Dict, base_config: Dict) -> fs.Simulation:
+    return _simulation_from_config(apply_template(*compile_template(base_config['simulation']), params), params)
+
+
+def _init_worker(base_config: Dict):
+    global TEMPLATE
+    TEMPLATE = compile_template(base_config['simulation'])
+
+
+def _worker_factory(params: Dict) -> fs.Simulation:
+    return _simulation_from_config(apply_template(*TEMPLATE, params), params)
+
+
+def _job_executor(config: Dict) -> ProcessPoolExecutor:
+    """Worker pool for one job; simulations run in processes instead of contending for the GIL.
+
+    With fork the workers inherit the config copy-on-write; elsewhere it is pickled once per
+    worker rather than once per task.
+    """
+    ctx = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=ctx,
+                               initializer=_init_worker, initargs=(config,))
+
+
+def _report_progress(job_id: str, done: int, total: int):
+    # Runs on the dispatch thread as results arrive; 100 is reserved for when results are stored
+    jobs[job_id]['progress'] = min(99, 100 * done // total)
+    jobs[job_id]['message'] = f'Simulated {done}/{total}'
+
+
 def run_simulations(config):
     job_id = config['job_id']
     try:
         param_distributions = {k: fs.create_distribution(v) for k, v in config['dists'].items()}
-        builder = fs.SimulationBuilder(lambda p: create_simulation(p, config), param_distributions)
-        sims = builder.build_simulations(config['num_simulations'], seed=config['seed'])
+        builder = fs.SimulationBuilder(_worker_factory, param_distributions)
+        with _job_executor(config) as executor:
+            sims = builder.build_simulations(config['num_simulations'], seed=config['seed'], executor=executor,
+                                             progress=partial(_report_progress, job_id))
         analyzer = fs.SimulationAnalyzer(sims)
         stats = analyzer.compute_statistics()
+        # Keep the simulations themselves; they are serialized in the format the client asks for
         results = {
-            'sims': [sim.to_dict() for sim in sims],
+            'sims': sims,
             'stats': stats,
         }
         jobs[job_id]['status'] = 'completed'
@@ -56,29 +137,72 @@ def run_simulations(config):
     except Exception as e:
         jobs[job_id]['status'] = 'failed'
         jobs[job_id]['message'] = str(e)
+    jobs[job_id]['expires_at'] = time.time() + RESULT_TTL
+
+
+def _consume_jobs():
+    while True:
+        config = JOB_Q.get()
+        job = jobs.get(config['job_id'])
+        if job is not None:  # Skips jobs evicted while queued
+            job['status'] = 'running'
+            job['message'] = 'Starting'
+            run_simulations(config)
+        JOB_Q.task_done()
+
+
+def _ensure_consumer():
+    # Started on first use rather than at import, so it lives in the process that serves requests
+    global _consumer
+    with _consumer_lock:
+        if _consumer is None or not _consumer.is_alive():
+            _consumer = threading.Thread(target=_consume_jobs, daemon=True)
+            _consumer.start()
+
+
+def _evict_expired():
+    now = time.time()
+    for job_id, job in list(jobs.items()):
+        if job.get('expires_at', now) < now:
+            jobs.pop(job_id, None)
+
 
 @app.route('/simulate', methods=['POST'])
 def simulate():
     config = request.json
     job_id = config.get('job_id', str(uuid.uuid4()))
-    jobs[job_id] = {'status': 'running', 'progress': 0, 'message': 'Starting', 'results': None}
-    
-    # Start background thread
-    thread = threading.Thread(target=run_simulations, args=(config,))
-    thread.start()
-    
+    config['job_id'] = job_id
+    _evict_expired()
+    _ensure_consumer()
+    jobs[job_id] = {'status': 'queued', 'progress': 0, 'message': 'Queued', 'results': None}
+    try:
+        JOB_Q.put_nowait(config)
+    except queue.Full:
+        del jobs[job_id]
+        return jsonify({'error': 'Job queue is full, try again later'}), 503
     return jsonify({'job_id': job_id}), 202
 
 @app.route('/status/<job_id>', methods=['GET'])
 def get_status(job_id):
     job = jobs.get(job_id, {'status': 'not_found', 'progress': 0, 'message': 'Job not found'})
-    return jsonify(job)
+    # Results are served by /results only; status polls stay small
+    return jsonify({k: v for k, v in job.items() if k != 'results'})
 
 @app.route('/results/<job_id>', methods=['GET'])
 def get_results(job_id):
     job = jobs.get(job_id)
     if job and job['status'] == 'completed':
-        return jsonify(job['results'])
+        results = job['results']
+        if request.args.get('format') == 'npz':
+            # Columnar binary: one array per field instead of a JSON value per event
+            arrays = fs.pack_simulations(results['sims'])
+            arrays['stats'] = np.array(orjson.dumps(results['stats'], option=orjson.OPT_SERIALIZE_NUMPY).decode())
+            buf = io.BytesIO()
+            np.savez(buf, **arrays)
+            return Response(buf.getvalue(), mimetype='application/octet-stream')
+        # orjson encodes the numeric-heavy payload in C and takes NumPy scalars as they are; NaN becomes null
+        payload = {'sims': [sim.to_dict() for sim in results['sims']], 'stats': results['stats']}
+        return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), mimetype='application/json')
     return jsonify({'error': 'Results not ready or not found'}), 404
 
 if __name__ == '__main__':
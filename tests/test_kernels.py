@@ -0,0 +1,57 @@
+import numpy as np
+
+from financial_simulator._kernels import amortize_step, loan_step
+
+TERM = 360.0
+# First payment, a held rate, a change then the same rate, and a zero-rate stretch
+RATES = [0.05] * 3 + [0.07] * 3 + [0.0] * 2 + [0.04] * (int(TERM) - 8)
+
+
+def _pow_step(balance, month, rate):
+    monthly_rate = rate / 12.0
+    remaining = TERM - month
+    if monthly_rate == 0.0:
+        payment = balance / remaining
+    else:
+        c = (1.0 + monthly_rate) ** remaining
+        payment = balance * monthly_rate * c / (c - 1.0)
+    interest = balance * monthly_rate
+    principal = min(payment - interest, balance)
+    return interest + principal, interest, principal, balance - principal
+
+
+def test_loan_step_carried_factor_matches_pow():
+    balance, ref_balance = 300000.0, 300000.0
+    prev_rate, growth = 0.0, 0.0
+    for month, rate in enumerate(RATES):
+        payment, interest, principal, balance, growth = loan_step(balance, float(month), rate, TERM, prev_rate, growth)
+        prev_rate = rate
+        np.testing.assert_allclose(growth, (1.0 + rate / 12.0) ** (TERM - month), rtol=1e-12)
+        ref_payment, _, _, ref_balance = _pow_step(ref_balance, month, rate)
+        np.testing.assert_allclose(payment, ref_payment, rtol=1e-9)
+        np.testing.assert_allclose(balance, ref_balance, rtol=1e-9, atol=1e-6)
+    assert balance == 0.0 or abs(balance) < 1e-6
+
+
+def test_amortize_step_carried_factor_matches_pow():
+    n = 3
+    balance = np.full(n, 300000.0)
+    month = np.zeros(n)
+    term = np.full(n, TERM)
+    prev_rate = np.zeros(n)
+    growth = np.zeros(n)
+    payment, interest, principal = np.empty(n), np.empty(n), np.empty(n)
+    active = np.empty(n, dtype=np.bool_)
+    # Path 0 follows RATES, path 1 holds one rate, path 2 alternates every month
+    paths = np.array([RATES, [0.06] * int(TERM), [0.03 if m % 2 else 0.08 for m in range(int(TERM))]])
+    ref_balance = balance.copy()
+    for m in range(int(TERM)):
+        rates = np.ascontiguousarray(paths[:, m])
+        amortize_step(balance, month, rates, term, prev_rate, growth, payment, interest, principal, active)
+        np.testing.assert_allclose(growth, np.where(rates == 0.0, 1.0, (1.0 + rates / 12.0) ** (TERM - m)),
+                                   rtol=1e-12)
+        for i in range(n):
+            ref_payment, _, _, ref_balance[i] = _pow_step(ref_balance[i], m, rates[i])
+            np.testing.assert_allclose(payment[i], ref_payment, rtol=1e-9)
+        np.testing.assert_allclose(balance, ref_balance, rtol=1e-9, atol=1e-6)
+    assert active.all() and np.all(np.abs(balance) < 1e-6)
@@ -0,0 +1,96 @@
+import datetime as dt
+import pickle
+
+import numpy as np
+
+import financial_simulator as fs
+
+START = dt.datetime(2026, 1, 1)
+END = dt.datetime(2027, 1, 1)
+
+
+def _run_sim():
+    sim = fs.Simulation('pickled', START, END, {'rate': 0.05, 'close': START})
+    sim.state = {'cumulative_cash': 0.0, 'property_value': 250000.0}
+    sim.add_continuous(fs.AppreciationProcess(0.03))
+    sim.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=30), START),
+                                            fs.FixedValue(1500.0), {'type': 'rent_income'}))
+    sim.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=30), START),
+                                            fs.VariableRateLoanValue(50000.0, 0.05, 12, 'heloc_rate'),
+                                            {'type': 'heloc'}))
+    sim.run()
+    return sim
+
+
+def _assert_same(loaded, sim):
+    assert loaded.name == sim.name and loaded.params == sim.params
+    np.testing.assert_array_equal(loaded.events.times, sim.events.times)
+    np.testing.assert_array_equal(loaded.events.values, sim.events.values)
+    np.testing.assert_array_equal(loaded.events.types, sim.events.types)
+    np.testing.assert_array_equal(loaded.events.balances, sim.events.balances)
+    assert loaded.events.metadata == sim.events.metadata
+    np.testing.assert_array_equal(loaded.state_history.times, sim.state_history.times)
+    assert loaded.state_history.keys() == sim.state_history.keys()
+    for k in sim.state_history.keys():
+        np.testing.assert_array_equal(loaded.state_history.column(k), sim.state_history.column(k))
+    assert loaded.state == sim.state
+
+
+def test_save_pickle_round_trip(tmp_path):
+    sim = _run_sim()
+    path = tmp_path / 'sim.pkl'
+    sim.save_pickle(str(path))
+    loaded = fs.Simulation.load_pickle(str(path))
+    _assert_same(loaded, sim)
+    # Logs come back trimmed to their recorded rows and still accept appends
+    assert len(loaded.events._times) == len(sim.events)
+    loaded.events.append(fs.Event(END, 1.0, {'type': 'rent_income'}))
+    assert len(loaded.events) == len(sim.events) + 1
+
+
+def test_load_pickle_reads_plain_pickle(tmp_path):
+    sim = _run_sim()
+    path = tmp_path / 'legacy.pkl'
+    with open(path, 'wb') as f:
+        pickle.dump(sim, f)
+    _assert_same(fs.Simulation.load_pickle(str(path)), sim)
+
+
+def test_pack_simulations_npz_round_trip(tmp_path):
+    first = _run_sim()
+    second = fs.Simulation('other', START, END, {'close': dt.datetime(2026, 3, 1, 12, 30)})
+    second.state = {'cumulative_cash': 0.0}
+    second.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=91)),
+                                               fs.RateChangeValue(fs.UniformDistribution(0.04, 0.06), 'heloc_rate'),
+                                               {'type': 'rate_change'}))
+    second.add_builder(fs.ComposedEventBuilder(fs.OneTimeTiming(START), fs.FixedValue(-500.0), {}))
+    second.run()
+    sims = [first, second]
+
+    path = tmp_path / 'sims.npz'
+    np.savez(path, **fs.pack_simulations(sims))
+    with np.load(path, allow_pickle=False) as z:
+        arrays = dict(z)
+    # Each simulation's type names are recovered from the shared codes and table
+    table = arrays['event_type_table'].tolist()
+    offsets = arrays['event_offsets']
+    for i, sim in enumerate(sims):
+        codes = arrays['event_type_codes'][offsets[i]:offsets[i + 1]]
+        assert [table[c] for c in codes] == sim.events.types.tolist()
+
+    for loaded, sim in zip(fs.unpack_simulations(arrays), sims):
+        assert loaded.name == sim.name
+        assert loaded.params == sim.params  # Datetime params come back as datetimes
+        assert (loaded.start, loaded.end) == (sim.start, sim.end)
+        np.testing.assert_array_equal(loaded.events.times, sim.events.times.astype('datetime64[s]'))
+        np.testing.assert_array_equal(loaded.events.values, sim.events.values)
+        np.testing.assert_array_equal(loaded.events.types, sim.events.types)
+        np.testing.assert_array_equal(loaded.events.principals, sim.events.principals)
+        np.testing.assert_array_equal(loaded.events.balances, sim.events.balances)
+        # Only the keys each simulation recorded, NaN gaps included
+        assert loaded.state_history.keys() == sim.state_history.keys()
+        np.testing.assert_array_equal(loaded.state_history.times, sim.state_history.times)
+        for k in sim.state_history.keys():
+            np.testing.assert_array_equal(loaded.state_history.column(k), sim.state_history.column(k))
+        assert loaded.state == sim.state
+    assert np.isnan(second.state_history.column('heloc_rate')[0])
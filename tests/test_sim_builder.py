@@ -0,0 +1,85 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+import financial_simulator as fs
+
+START = dt.datetime(2026, 1, 1)
+END = dt.datetime(2028, 1, 1)
+
+
+def _draw_factory(params):
+    sim = fs.Simulation('draws', START, END, params)
+    sim.state = {'cumulative_cash': 0.0}
+    sim.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=30), START),
+                                            fs.DistributionValue(fs.UniformDistribution(0.0, 1.0)),
+                                            {'type': 'draw'}))
+    return sim
+
+
+def test_vectorized_tick_draws_do_not_replay_param_draws():
+    builder = fs.SimulationBuilder(_draw_factory, {'x': fs.UniformDistribution(0.0, 1.0)})
+    sims = builder.build_simulations_vectorized(20, seed=7)
+    params = np.array([sim.params['x'] for sim in sims])
+    first_ticks = np.array([sim.events.values[0] for sim in sims])
+    assert not np.isin(first_ticks, params).any()
+
+
+def _runtime_key_factory(params):
+    # heloc_rate is not in the initial state; only the RateChange builder writes it
+    sim = fs.Simulation('runtime_key', START, END, params)
+    sim.state = {'cumulative_cash': 0.0, 'property_value': params['appraisal']}
+    sim.add_continuous(fs.AppreciationProcess(0.03))
+    sim.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=30), START),
+                                            fs.FixedValue(params['rent']), {'type': 'rent_income'}))
+    sim.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=91)),
+                                            fs.RateChangeValue(fs.UniformDistribution(0.05, 0.05), 'heloc_rate'),
+                                            {'type': 'rate_change'}))
+    return sim
+
+
+def test_vectorized_state_keys_match_process_mode():
+    dists = {'appraisal': fs.NormalDistribution(300000, 20000), 'rent': fs.NormalDistribution(2000, 200)}
+    builder = fs.SimulationBuilder(_runtime_key_factory, dists)
+    vectorized = builder.build_simulations_vectorized(4, seed=3)
+    processed = builder.build_simulations(4, seed=3)
+    for vec, proc in zip(vectorized, processed):
+        assert vec.state_history.keys() == proc.state_history.keys()
+        assert list(vec.state) == list(proc.state)
+        assert (vec.state_history.times == proc.state_history.times).all()
+        rates = proc.state_history.column('heloc_rate')
+        np.testing.assert_array_equal(np.isnan(vec.state_history.column('heloc_rate')), np.isnan(rates))
+        np.testing.assert_allclose(vec.state_history.column('heloc_rate'), rates)
+        assert vec.state['heloc_rate'] == proc.state['heloc_rate']
+
+
+def _leave_time_factory(params):
+    # The event date itself is sampled, so every path has its own schedule
+    sim = fs.Simulation('leave', START, END, params)
+    sim.state = {'cumulative_cash': 0.0}
+    sim.add_builder(fs.ComposedEventBuilder(fs.OneTimeTiming(params['leave_time']), fs.FixedValue(-100.0),
+                                            {'type': 'leave'}))
+    return sim
+
+
+def test_vectorized_rejects_param_dependent_timing():
+    dists = {'leave_time': fs.DateDistribution(dt.datetime(2026, 6, 1), dt.datetime(2027, 6, 1))}
+    builder = fs.SimulationBuilder(_leave_time_factory, dists)
+    with pytest.raises(ValueError, match='schedule shared'):
+        builder.build_simulations_vectorized(5, seed=1)
+
+
+def _rate_key_factory(params):
+    sim = fs.Simulation('keys', START, END, params)
+    sim.state = {'cumulative_cash': 0.0}
+    key = 'rate_a' if params['pick'] < 0.5 else 'rate_b'
+    sim.add_builder(fs.ComposedEventBuilder(fs.IntervalTiming(dt.timedelta(days=30), START),
+                                            fs.VariableRateLoanValue(1000.0, 0.05, 12, key), {'type': 'heloc'}))
+    return sim
+
+
+def test_vectorized_rejects_differing_state_keys():
+    builder = fs.SimulationBuilder(_rate_key_factory, {'pick': fs.UniformDistribution(0.0, 1.0)})
+    with pytest.raises(ValueError, match='rate_key'):
+        builder.build_simulations_vectorized(20, seed=1)
@@ -0,0 +1,11 @@
+"""WSGI entry point for production serving.
+
+Run with a threaded worker so /status and /results polls are answered while jobs are
+being submitted and run:
+
+    gunicorn -k gthread -w 1 --threads 8 -b 0.0.0.0:5001 wsgi:app
+
+Keep a single worker process: job state lives in simulation_server.jobs, and the
+simulations themselves already run in per-job process pools.
+"""
+from simulation_server import app